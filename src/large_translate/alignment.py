@@ -0,0 +1,148 @@
+"""Numbered segment markers for aligning translations with their source segments."""
+
+import re
+from collections.abc import Awaitable, Callable
+
+# Marker opening each segment in a translation request, e.g. "[[3]] Text..."
+SEGMENT_MARKER = "[[{number}]]"
+MARKER_PATTERN = re.compile(r"^[ \t]*\[\[(\d+)\]\][ \t]*", re.MULTILINE)
+
+
+class MissingSegmentsError(Exception):
+    """Raised when segments are still missing from a translation after requesting them again."""
+
+    def __init__(self, texts: list[str], parts: list[str | None]):
+        self.texts = texts
+        self.parts = parts
+        self.indices = [i for i, part in enumerate(parts) if part is None]
+        super().__init__(f"No translation for segments {[i + 1 for i in self.indices]}")
+
+    def keep_source(self) -> list[str]:
+        """Get the translated parts, with the source text for the missing segments."""
+        return [part if part is not None else text for text, part in zip(self.texts, self.parts)]
+
+
+def number_segments(texts: list[str]) -> str:
+    """Join segment texts into one request, each opened by its numbered marker."""
+    return "\n\n".join(
+        f"{SEGMENT_MARKER.format(number=n)} {text}" for n, text in enumerate(texts, 1)
+    )
+
+
+def parse_numbered(translated_text: str, count: int) -> list[str | None]:
+    """
+    Split a translation of `number_segments` output back into segments.
+
+    Text is assigned to segments by marker, so merged, split or reordered
+    paragraphs do not shift later segments. A response without any markers is
+    accepted as-is for a single segment, or split on blank lines if that gives
+    exactly one part per segment.
+
+    Returns:
+        One translated part per segment, None where the marker is missing or
+        has no text.
+    """
+    parts: list[str | None] = [None] * count
+    matches = list(MARKER_PATTERN.finditer(translated_text))
+
+    if not matches:
+        text = translated_text.strip()
+        if count == 1 and text:
+            return [text]
+        paragraphs = text.split("\n\n")
+        if text and len(paragraphs) == count:
+            return [p.strip() or None for p in paragraphs]
+        return parts
+
+    for match, following in zip(matches, matches[1:] + [None]):
+        index = int(match.group(1)) - 1
+        end = following.start() if following else len(translated_text)
+        # Keep the first non-empty occurrence if the model repeats a marker
+        if 0 <= index < count and parts[index] is None:
+            parts[index] = translated_text[match.end() : end].strip() or None
+    return parts
+
+
+def misaligned(texts: list[str], parts: list[str | None]) -> list[int]:
+    """
+    Find the segments whose translation has to be requested again.
+
+    These are the segments without a translation, plus the segment just before
+    each gap if its translation has more paragraph breaks than its source -
+    the model most likely merged the missing segment into it.
+    """
+    indices = []
+    for i, part in enumerate(parts):
+        if part is None:
+            indices.append(i)
+        elif (
+            i + 1 < len(parts)
+            and parts[i + 1] is None
+            and part.count("\n\n") > texts[i].count("\n\n")
+        ):
+            indices.append(i)
+    return indices
+
+
+async def translate_aligned(
+    texts: list[str],
+    translate: Callable[[str], Awaitable[str]],
+) -> list[str]:
+    """
+    Translate segment texts with numbered markers, repairing misalignment.
+
+    Args:
+        texts: Source segment texts.
+        translate: Translates one request's text.
+
+    Returns:
+        One translated part per text.
+
+    Raises:
+        MissingSegmentsError: If segments are still missing after retrying them.
+    """
+    parts = parse_numbered(await translate(number_segments(texts)), len(texts))
+    return await repair_alignment(texts, parts, translate)
+
+
+async def repair_alignment(
+    texts: list[str],
+    parts: list[str | None],
+    translate: Callable[[str], Awaitable[str]],
+) -> list[str]:
+    """
+    Re-request only the misaligned segments of a translation.
+
+    The misaligned segments are first requested again together; any still
+    misaligned after that are translated one at a time, where there is
+    nothing left to misalign.
+
+    Args:
+        texts: Source segment texts.
+        parts: Translated parts from `parse_numbered`.
+        translate: Translates one request's text.
+
+    Returns:
+        One translated part per text.
+
+    Raises:
+        MissingSegmentsError: If segments are still missing after retrying
+            them, rather than padding the translation with blanks.
+    """
+    parts = list(parts)
+    retry = misaligned(texts, parts)
+    if len(retry) > 1:
+        retranslated = parse_numbered(
+            await translate(number_segments([texts[i] for i in retry])), len(retry)
+        )
+        for i, part in zip(retry, retranslated):
+            if part is not None:
+                parts[i] = part
+        retry = misaligned(texts, parts)
+
+    for i in retry:
+        parts[i] = parse_numbered(await translate(number_segments([texts[i]])), 1)[0]
+
+    if any(part is None for part in parts):
+        raise MissingSegmentsError(texts, parts)
+    return parts
@@ -1,9 +1,20 @@
 """Batch translation engine - orchestrates batch translation process."""
 
 import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
 
 from rich.progress import Progress
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 from .checkpoint import (
     CheckpointData,
@@ -11,23 +22,97 @@ from .checkpoint import (
     deserialize_segment,
     serialize_segment,
 )
-from .chunking import Chunk, ChunkingStrategy
-from .models.base import BaseLLMProvider, BatchRequest
-from .parsers.base import BaseParser, TextSegment
+from .alignment import (
+    MissingSegmentsError,
+    number_segments,
+    parse_numbered,
+    repair_alignment,
+    translate_aligned,
+)
+from .chunking import Chunk, ChunkingStrategy, reassemble_chunk
+from .expansion import ExpansionRatios
+from .incremental import reuse_previous_translation
+from .models.base import (
+    BaseLLMProvider,
+    BatchRequest,
+    BatchResult,
+    TranslationTruncatedError,
+)
+from .parsers.base import BaseParser, SegmentWriter, TextSegment
+from .pipeline import run_bounded, translate_halves, translate_resplitting
+from .polling import BatchNotifier, PollSchedule
+from .translation_memory import TranslationMemory
+
+
+@dataclass
+class _BatchFile:
+    """A file whose chunks are translated through the batch API."""
+
+    input_path: Path
+    output_path: Path
+    parser: BaseParser
+    chunks: list[Chunk] = field(default_factory=list)
+    # Chunk index -> translated parts (None keeps the original) of finished
+    # chunks not yet written
+    translations: dict[int, list[str] | None] = field(default_factory=dict)
+    # Index of the next chunk to write; opened with the first chunk written
+    written: int = 0
+    writer: SegmentWriter | None = None
+    done: bool = False
+    input_chars: int = 0
+    output_chars: int = 0
+    cached_chunks: int = 0
+    resplit_chunks: int = 0
+    fallback_chunks: int = 0
+    pulled_chunks: int = 0
 
 
 class BatchTranslationEngine:
     """Batch translation orchestrator using async batch APIs."""
 
+    # Seconds one chunk is assumed to take in real time when scheduling
+    # chunks against a deadline
+    REALTIME_CHUNK_SECONDS = 60.0
+    # Margin on the estimated real-time duration, so pulled chunks finish
+    # before the deadline despite retries and rate limits
+    DEADLINE_SAFETY = 1.5
+    # Shortest wait between status checks of a batch; poll_interval is the longest
+    MIN_POLL_INTERVAL = 5.0
+
     def __init__(
         self,
         llm_provider: BaseLLMProvider,
         parser: BaseParser,
         chunk_size: int = 4000,
+        memory: TranslationMemory | None = None,
+        expansion: ExpansionRatios | None = None,
+        concurrency: int = 1,
+        notifier: BatchNotifier | None = None,
     ):
+        """
+        Initialize the batch translation engine.
+
+        Args:
+            llm_provider: The LLM provider to use for translation.
+            parser: The file parser to use.
+            chunk_size: Maximum tokens per chunk.
+            memory: Translation memory consulted before submitting chunks and
+                updated with the batch results.
+            expansion: Per-language expansion ratios used to keep chunks within
+                the model's output budget; updated from the batch results.
+            concurrency: Maximum number of real-time requests in flight when
+                chunks whose batch requests failed are translated again.
+            notifier: Notifications that a batch may have changed, e.g. from
+                a webhook receiver. Batches are then checked when notified,
+                and otherwise only every poll_interval.
+        """
         self.llm = llm_provider
         self.parser = parser
         self.chunker = ChunkingStrategy(max_tokens=chunk_size)
+        self.memory = memory
+        self.expansion = expansion or ExpansionRatios()
+        self.concurrency = max(1, concurrency)
+        self.notifier = notifier
 
     async def translate_file_batch(
         self,
@@ -38,6 +123,10 @@ class BatchTranslationEngine:
         poll_interval: int = 60,
         progress: Progress | None = None,
         verbose: bool = False,
+        previous_source: Path | None = None,
+        previous_output: Path | None = None,
+        partial_output: Path | None = None,
+        deadline: datetime | None = None,
     ) -> dict:
         """
         Translate a file using batch API.
@@ -47,9 +136,18 @@ class BatchTranslationEngine:
             output_path: Path to write the translated file.
             target_language: Target language for translation.
             source_language: Source language (auto-detect if None).
-            poll_interval: Seconds between status checks.
+            poll_interval: Longest wait between status checks of a batch.
             progress: Optional Rich progress instance.
             verbose: Enable verbose output.
+            previous_source: Source file of an earlier translation run.
+            previous_output: Translation produced from previous_source; its
+                segments are reused wherever the source is unchanged.
+            partial_output: Path to write a preview to whenever results come
+                in, with the source text where there is no translation yet;
+                removed once the translation is complete.
+            deadline: Time the translation should be finished by; chunks
+                still waiting on their batch are moved to real-time
+                translation in time to meet it.
 
         Returns:
             Dictionary with translation statistics including 'resumed' if resuming from checkpoint.
@@ -57,227 +155,1363 @@ class BatchTranslationEngine:
         # Initialize checkpoint manager
         checkpoint_mgr = CheckpointManager(output_path)
 
-        # 1. Parse input file
-        segments = self.parser.parse(input_path)
+        # 1. Parse input file lazily
+        segments: Iterable[TextSegment] = self.parser.iter_segments(input_path)
+
+        # Reuse the previous translation for unchanged segments
+        reused_segments = 0
+        if previous_source is not None and previous_output is not None:
+            segments = list(segments)
+            if verbose and progress:
+                progress.console.print(f"Parsed {len(segments)} segments from input file")
+            segments, reused_segments = reuse_previous_translation(
+                segments,
+                self.parser.parse(previous_source),
+                self.parser.parse(previous_output),
+            )
+            if verbose and progress:
+                progress.console.print(
+                    f"Reusing {reused_segments}/{len(segments)} segments from previous translation"
+                )
+
+        # Check for existing checkpoint
+        input_size = input_path.stat().st_size
+        checkpoint = checkpoint_mgr.load()
+        if checkpoint and (
+            checkpoint.input_path != str(input_path) or checkpoint.input_size != input_size
+        ):
+            checkpoint = None
+        chunker, token_rates = self._batch_chunker(target_language, checkpoint)
+        resume_ids = self._resume_ids(checkpoint, target_language)
+
+        # 2-3. Create chunks and, as each one is produced, build batch requests
+        # for those not already in translation memory
+        file = _BatchFile(input_path, output_path, self.parser)
+        batch_requests: list[BatchRequest] = []
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]] = {}
+        self._plan_file(
+            file,
+            segments,
+            chunker,
+            token_rates,
+            target_language,
+            source_language,
+            "",
+            batch_requests,
+            chunk_mapping,
+            resume_ids,
+        )
+        if resume_ids and (
+            checkpoint.total_chunks != len(file.chunks)
+            or not self._same_chunks(checkpoint, chunk_mapping)
+        ):
+            # A different job; don't resubmit what memory has by now
+            if progress:
+                progress.console.print(
+                    "[yellow]Checkpoint does not match the input; submitting new batches[/yellow]"
+                )
+            batch_requests = self._drop_recalled(
+                batch_requests, chunk_mapping, target_language, source_language
+            )
+            resume_ids = set()
+
         if verbose and progress:
-            progress.console.print(f"Parsed {len(segments)} segments from input file")
+            progress.console.print(f"Created {len(file.chunks)} chunks for batch processing")
+        if verbose and progress and file.cached_chunks:
+            progress.console.print(
+                f"Reusing {file.cached_chunks} chunks from translation memory"
+            )
+
+        if not batch_requests:
+            # Nothing left to translate
+            self._write_ready(file, final=True)
+            return {
+                "input_chars": file.input_chars,
+                "output_chars": file.output_chars,
+                "chunks": file.cached_chunks,
+                "batch_id": None,
+                "cached_chunks": file.cached_chunks,
+                "reused_segments": reused_segments,
+            }
+
+        template = CheckpointData(
+            engine_type="batch",
+            input_path=str(input_path),
+            output_path=str(output_path),
+            target_language=target_language,
+            source_language=source_language,
+            chunk_size=chunker.max_tokens,
+            last_completed_chunk=-1,
+            total_chunks=len(file.chunks),
+            translated_segments=[],
+            context_history=[],
+            chunk_mapping=self._serialize_mapping(chunk_mapping),
+            input_size=input_size,
+            token_rates=token_rates,
+        )
+
+        # Split into as many provider batches as its limits require
+        shards = self._shard_requests(batch_requests)
+
+        resumed = False
+        if resume_ids:
+            resumed = self._resume_batches(checkpoint, template, len(shards), progress)
+
+        def write_partial() -> None:
+            self._write_partial(
+                file,
+                partial_output,
+                checkpoint_mgr.load_results(),
+                chunk_mapping,
+                target_language,
+                source_language,
+            )
+
+        # 4-7. Submit (if not resuming) and poll; each batch's results are
+        # streamed into the output as soon as the batch completes
+        batch_ids = await self._harvest_batches(
+            shards,
+            chunk_mapping,
+            [file],
+            checkpoint_mgr,
+            template,
+            resumed,
+            target_language,
+            source_language,
+            poll_interval,
+            progress,
+            verbose,
+            write_partial if partial_output is not None else None,
+            deadline,
+        )
+
+        # 8. Write the remaining chunks, keeping originals where no translation was made
+        try:
+            self._write_ready(file, final=True)
+        except BaseException:
+            self._abort_outputs([file])
+            raise
+
+        # 9. Clean up checkpoint on success
+        checkpoint_mgr.clean()
+        if partial_output is not None:
+            partial_output.unlink(missing_ok=True)
+
+        # 10. Calculate stats
+        result = {
+            "input_chars": file.input_chars,
+            "output_chars": file.output_chars,
+            "chunks": len(file.chunks),
+            "batch_id": batch_ids[0],
+            "batch_ids": batch_ids,
+            "cached_chunks": file.cached_chunks,
+            "resplit_chunks": file.resplit_chunks,
+            "fallback_chunks": file.fallback_chunks,
+            "pulled_chunks": file.pulled_chunks,
+            "reused_segments": reused_segments,
+        }
+        if resumed:
+            result["resumed"] = True
+        return result
+
+    async def translate_files_batch(
+        self,
+        files: list[tuple[Path, Path, BaseParser]],
+        target_language: str,
+        checkpoint_path: Path,
+        source_language: str | None = None,
+        poll_interval: int = 60,
+        progress: Progress | None = None,
+        verbose: bool = False,
+        deadline: datetime | None = None,
+    ) -> dict[Path, dict]:
+        """
+        Translate many files with as few batch jobs as the provider allows.
+
+        Chunks of all files are packed into one submission, split into as
+        many provider batches as its limits require. Every request's
+        custom_id carries its file's position (`f{file}-chunk-{i}`), so the
+        results are routed back to each file's output.
+
+        Args:
+            files: (input path, output path, parser) for each file.
+            target_language: Target language for translation.
+            checkpoint_path: Path the batch checkpoint is stored alongside.
+            source_language: Source language (auto-detect if None).
+            poll_interval: Longest wait between status checks of a batch.
+            progress: Optional Rich progress instance.
+            verbose: Enable verbose output.
+            deadline: Time the translation should be finished by; chunks
+                still waiting on their batch are moved to real-time
+                translation in time to meet it.
+
+        Returns:
+            Translation statistics for each input path.
+        """
+        checkpoint_mgr = CheckpointManager(checkpoint_path)
+
+        # Chunk exactly as an interrupted run did, so its batches can be resumed
+        checkpoint = checkpoint_mgr.load()
+        chunker, token_rates = self._batch_chunker(target_language, checkpoint)
+        resume_ids = self._resume_ids(checkpoint, target_language)
+
+        batch_files = []
+        batch_requests: list[BatchRequest] = []
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]] = {}
+        for n, (input_path, output_path, parser) in enumerate(files):
+            file = _BatchFile(input_path, output_path, parser)
+            self._plan_file(
+                file,
+                parser.iter_segments(input_path),
+                chunker,
+                token_rates,
+                target_language,
+                source_language,
+                f"f{n}-",
+                batch_requests,
+                chunk_mapping,
+                resume_ids,
+            )
+            batch_files.append(file)
+
+        if resume_ids and not self._same_chunks(checkpoint, chunk_mapping):
+            # A different job; don't resubmit what memory has by now
+            if progress:
+                progress.console.print(
+                    "[yellow]Checkpoint does not match the input; submitting new batches[/yellow]"
+                )
+            batch_requests = self._drop_recalled(
+                batch_requests, chunk_mapping, target_language, source_language
+            )
+            resume_ids = set()
 
-        # 2. Create chunks
-        chunks = self.chunker.chunk_segments(segments, self.llm.count_tokens)
         if verbose and progress:
-            progress.console.print(f"Created {len(chunks)} chunks for batch processing")
+            progress.console.print(
+                f"Created {len(batch_requests)} batch requests from {len(files)} files"
+            )
+
+        shards: list[list[BatchRequest]] = []
+        batch_ids: list[str] = []
+        resumed = False
+        if batch_requests:
+            shards = self._shard_requests(batch_requests)
+            template = CheckpointData(
+                engine_type="batch",
+                input_path=str(checkpoint_path),
+                output_path=str(checkpoint_path),
+                target_language=target_language,
+                source_language=source_language,
+                chunk_size=chunker.max_tokens,
+                last_completed_chunk=-1,
+                total_chunks=len(batch_requests),
+                translated_segments=[],
+                context_history=[],
+                chunk_mapping=self._serialize_mapping(chunk_mapping),
+                token_rates=token_rates,
+            )
+
+            # Resume the batches only if they hold exactly these requests
+            if resume_ids:
+                resumed = self._resume_batches(checkpoint, template, len(shards), progress)
+
+            # Each file is written as its chunks' results stream in
+            batch_ids = await self._harvest_batches(
+                shards,
+                chunk_mapping,
+                batch_files,
+                checkpoint_mgr,
+                template,
+                resumed,
+                target_language,
+                source_language,
+                poll_interval,
+                progress,
+                verbose,
+                deadline=deadline,
+            )
 
-        # 3. Build batch requests
-        batch_requests = []
-        chunk_mapping: dict[str, tuple[int, Chunk]] = {}  # custom_id -> (index, chunk)
+        # Batches each file's requests went into
+        file_batch_ids: dict[Path, set[str]] = {file.input_path: set() for file in batch_files}
+        for batch_id, shard in zip(batch_ids, shards):
+            for request in shard:
+                file, _ = chunk_mapping[request.custom_id]
+                file_batch_ids[file.input_path].add(batch_id)
+
+        # Write what remains of each file, keeping originals where no translation was made
+        try:
+            for file in batch_files:
+                self._write_ready(file, final=True)
+        except BaseException:
+            self._abort_outputs(batch_files)
+            raise
+
+        stats = {}
+        for file in batch_files:
+            stats[file.input_path] = {
+                "input_chars": file.input_chars,
+                "output_chars": file.output_chars,
+                "chunks": len(file.chunks),
+                "batch_ids": sorted(file_batch_ids[file.input_path]),
+                "cached_chunks": file.cached_chunks,
+                "resplit_chunks": file.resplit_chunks,
+                "fallback_chunks": file.fallback_chunks,
+                "pulled_chunks": file.pulled_chunks,
+            }
+            if resumed:
+                stats[file.input_path]["resumed"] = True
+
+        # Clean up the checkpoint only once every output is written
+        checkpoint_mgr.clean()
+        return stats
+
+    def _batch_chunker(
+        self,
+        target_language: str,
+        checkpoint: CheckpointData | None,
+    ) -> tuple[ChunkingStrategy, dict[str, float] | None]:
+        """
+        Get the chunking strategy and token rates for a batch job.
+
+        Chunk size is capped so translations fit the model's output budget. A
+        resumed batch is re-chunked exactly as it was submitted, with the
+        token rates it was sized with.
+        """
+        if (
+            checkpoint
+            and checkpoint.engine_type == "batch"
+            and checkpoint.target_language == target_language
+            and checkpoint.chunk_size <= self.chunker.max_tokens
+        ):
+            return (
+                ChunkingStrategy(max_tokens=checkpoint.chunk_size),
+                checkpoint.token_rates or self.llm.token_rates,
+            )
+        chunker = self.chunker.with_output_budget(
+            self.llm.max_output_tokens,
+            self.expansion.ratio(self.llm.model_id, target_language),
+        )
+        return chunker, self.llm.token_rates
+
+    @staticmethod
+    def _resume_ids(checkpoint: CheckpointData | None, target_language: str) -> set[str]:
+        """
+        Get the request IDs of a checkpoint's batches, if they may be resumed.
+
+        Returns:
+            The IDs, or an empty set if the checkpoint has no batches to resume.
+        """
+        if (
+            checkpoint
+            and checkpoint.engine_type == "batch"
+            and checkpoint.target_language == target_language
+            and checkpoint.batch_id
+        ):
+            return set(checkpoint.chunk_mapping or {})
+        return set()
+
+    def _plan_file(
+        self,
+        file: _BatchFile,
+        segments: Iterable[TextSegment],
+        chunker: ChunkingStrategy,
+        token_rates: dict[str, float] | None,
+        target_language: str,
+        source_language: str | None,
+        id_prefix: str,
+        batch_requests: list[BatchRequest],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        resume_ids: set[str],
+    ) -> None:
+        """
+        Chunk a file and add a batch request for each chunk memory can't cover.
+
+        Args:
+            file: File being planned; its chunks, recalled translations and
+                input size are filled in.
+            segments: The file's segments.
+            chunker: Chunking strategy.
+            token_rates: Token rates chunks are sized with (see
+                BaseLLMProvider.token_counters).
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+            id_prefix: Prefix of the file's custom_ids, unique per file.
+            batch_requests: Requests to extend.
+            chunk_mapping: custom_id -> (file, chunk) to extend.
+            resume_ids: Requests of batches that may be resumed; these are
+                planned as submitted, even if memory has them by now (e.g.
+                harvested before an interruption).
+        """
+        count_tokens, count_tokens_many = self.llm.token_counters(token_rates)
+        for chunk in chunker.iter_chunks(segments, count_tokens, count_tokens_many):
+            i = chunk.chunk_index
+            file.chunks.append(chunk)
+            file.input_chars += sum(len(s.text) for s in chunk.segments)
 
-        for i, chunk in enumerate(chunks):
             # Get translatable text
             translatable = [s for s in chunk.segments if not s.skip_translation]
             if not translatable:
+                file.translations[i] = None
+                continue
+
+            custom_id = f"{id_prefix}chunk-{i}"
+            if custom_id not in resume_ids and self._recall_chunk(
+                file, chunk, target_language, source_language
+            ):
                 continue
 
-            combined_text = "\n\n".join(s.text for s in translatable)
-            custom_id = f"chunk-{i}"
             batch_requests.append(
                 BatchRequest(
                     custom_id=custom_id,
-                    text=combined_text,
+                    text=number_segments([s.text for s in translatable]),
                     target_language=target_language,
                     source_language=source_language,
                 )
             )
-            chunk_mapping[custom_id] = (i, chunk)
+            chunk_mapping[custom_id] = (file, chunk)
 
-        if not batch_requests:
-            # No translatable content
-            self.parser.write(segments, output_path, input_path)
-            return {
-                "input_chars": sum(len(s.text) for s in segments),
-                "output_chars": sum(len(s.text) for s in segments),
-                "chunks": 0,
-                "batch_id": None,
-            }
+    def _recall_chunk(
+        self,
+        file: _BatchFile,
+        chunk: Chunk,
+        target_language: str,
+        source_language: str | None,
+    ) -> bool:
+        """
+        Fill in a chunk's translation from translation memory.
+
+        Returns:
+            Whether memory had the chunk.
+        """
+        if self.memory is None:
+            return False
+        parts = self.memory.recall(
+            [s.text for s in chunk.segments if not s.skip_translation],
+            target_language,
+            source_language,
+            self.llm.model_id,
+        )
+        if parts is None:
+            return False
+        file.translations[chunk.chunk_index] = parts
+        file.cached_chunks += 1
+        return True
+
+    def _drop_recalled(
+        self,
+        batch_requests: list[BatchRequest],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        target_language: str,
+        source_language: str | None,
+    ) -> list[BatchRequest]:
+        """
+        Drop the requests whose chunks translation memory covers.
 
-        # Serialize chunk mapping for checkpoint
-        chunk_mapping_serialized = {
+        Returns:
+            The remaining requests; chunk_mapping is pruned to match.
+        """
+        remaining = []
+        for request in batch_requests:
+            file, chunk = chunk_mapping[request.custom_id]
+            if self._recall_chunk(file, chunk, target_language, source_language):
+                del chunk_mapping[request.custom_id]
+            else:
+                remaining.append(request)
+        return remaining
+
+    @staticmethod
+    def _serialize_mapping(
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+    ) -> dict[str, dict]:
+        """Serialize a chunk mapping for a checkpoint."""
+        return {
             custom_id: {
-                "index": idx,
+                "file": str(file.input_path),
+                "index": chunk.chunk_index,
                 "segments": [serialize_segment(s) for s in chunk.segments],
             }
-            for custom_id, (idx, chunk) in chunk_mapping.items()
+            for custom_id, (file, chunk) in chunk_mapping.items()
         }
 
-        # Check for existing checkpoint
-        checkpoint = checkpoint_mgr.load()
-        batch_id = None
-        resumed = False
+    @staticmethod
+    def _same_chunks(
+        checkpoint: CheckpointData,
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+    ) -> bool:
+        """
+        Whether a checkpoint's requests are exactly these chunks.
 
-        if checkpoint and checkpoint.engine_type == "batch":
-            # Validate checkpoint matches current job
+        Request IDs only encode file position and chunk index, so each
+        request's file and source text are compared too; a reordered, replaced
+        or edited file must not receive another file's results.
+        """
+        recorded = checkpoint.chunk_mapping or {}
+        if set(recorded) != set(chunk_mapping):
+            return False
+        for custom_id, (file, chunk) in chunk_mapping.items():
+            entry = recorded[custom_id]
             if (
-                checkpoint.input_path == str(input_path)
-                and checkpoint.target_language == target_language
-                and checkpoint.total_chunks == len(chunks)
-                and checkpoint.batch_id
+                entry.get("file") != str(file.input_path)
+                or entry.get("index") != chunk.chunk_index
+                or [s.get("text") for s in entry.get("segments", [])]
+                != [s.text for s in chunk.segments]
+            ):
+                return False
+        return True
+
+    def _shard_requests(self, batch_requests: list[BatchRequest]) -> list[list[BatchRequest]]:
+        """
+        Split requests into provider batches within its request and size limits.
+
+        Requests keep their order, so the same requests always give the same
+        shards and an interrupted job's batches line up on resume.
+        """
+        shards: list[list[BatchRequest]] = []
+        shard: list[BatchRequest] = []
+        shard_bytes = 0
+        for request in batch_requests:
+            size = self.llm.batch_request_size(request)
+            if shard and (
+                len(shard) >= self.llm.MAX_BATCH_REQUESTS
+                or shard_bytes + size > self.llm.MAX_BATCH_BYTES
             ):
-                batch_id = checkpoint.batch_id
-                resumed = True
+                shards.append(shard)
+                shard, shard_bytes = [], 0
+            shard.append(request)
+            shard_bytes += size
+        if shard:
+            shards.append(shard)
+        return shards
+
+    @staticmethod
+    def _resume_batches(
+        checkpoint: CheckpointData,
+        template: CheckpointData,
+        shard_count: int,
+        progress: Progress | None,
+    ) -> bool:
+        """
+        Adopt a checkpoint's batch IDs if it was split into the same shards.
+
+        Checkpoints from before sharding hold only batch_id, for a single batch.
+
+        Returns:
+            Whether the batches are resumed.
+        """
+        batch_ids = checkpoint.batch_ids or [checkpoint.batch_id]
+        if len(batch_ids) != shard_count:
+            return False
+        template.batch_ids = batch_ids
+        if progress:
+            progress.console.print(
+                f"[yellow]Resuming from checkpoint: batch {', '.join(b for b in batch_ids if b)} (stage: {checkpoint.batch_stage})[/yellow]"
+            )
+        return True
+
+    async def _harvest_batches(
+        self,
+        shards: list[list[BatchRequest]],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        files: list[_BatchFile],
+        checkpoint_mgr: CheckpointManager,
+        template: CheckpointData,
+        resumed: bool,
+        target_language: str,
+        source_language: str | None,
+        poll_interval: int,
+        progress: Progress | None,
+        verbose: bool,
+        on_harvest: Callable[[], None] | None = None,
+        deadline: datetime | None = None,
+    ) -> list[str]:
+        """
+        Run a job's batches and stream their results into the files' outputs.
+
+        Each result is recorded in the checkpoint as soon as it is processed.
+        A resumed job applies the recorded results without downloading them
+        again, and skips batches whose results were all recorded. Once every
+        batch has finished, requests that failed, expired, were canceled or
+        got no result are translated in real time. With a deadline, chunks
+        still waiting on their batch are pulled into real-time translation
+        as it nears, and batches left with nothing to deliver are canceled.
+
+        Args:
+            shards: Requests of each batch.
+            chunk_mapping: custom_id -> (file, chunk).
+            files: Files the requests belong to.
+            checkpoint_mgr: Checkpoint manager for the job.
+            template: Checkpoint data saved at each stage.
+            resumed: Whether the checkpoint's batches are resumed.
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+            poll_interval: Longest wait between status checks of a batch.
+            progress: Optional Rich progress instance.
+            verbose: Enable verbose output.
+            on_harvest: Called whenever a batch's results have been processed.
+            deadline: Time the job should be finished by.
+
+        Returns:
+            The batch IDs, in shard order.
+        """
+        request_ids = [request.custom_id for shard in shards for request in shard]
+        if resumed:
+            harvested = checkpoint_mgr.load_results()
+        else:
+            # Anything recorded belongs to a job that can't be resumed
+            checkpoint_mgr.clean()
+            harvested = {}
+
+        try:
+            for custom_id, translated_parts in harvested.items():
+                if custom_id in chunk_mapping:
+                    file, chunk = chunk_mapping[custom_id]
+                    file.translations[chunk.chunk_index] = translated_parts
+            for file in files:
+                self._write_ready(file)
+            if harvested:
                 if progress:
                     progress.console.print(
-                        f"[yellow]Resuming from checkpoint: batch {batch_id} (stage: {checkpoint.batch_stage})[/yellow]"
+                        f"Reusing {len(harvested)} results fetched before the interruption"
                     )
+                if on_harvest is not None:
+                    on_harvest()
 
-        # 4. Submit batch (if not resuming)
-        if batch_id is None:
-            if progress:
-                progress.console.print(f"Submitting batch with {len(batch_requests)} requests...")
-            batch_id = await self.llm.create_batch(batch_requests)
-            if progress:
-                progress.console.print(f"Batch created: {batch_id}")
+            async def on_result(result: BatchResult) -> None:
+                await self._apply_result(
+                    result,
+                    chunk_mapping,
+                    checkpoint_mgr,
+                    target_language,
+                    source_language,
+                    progress,
+                )
+
+            # Requests being translated in real time to meet the deadline
+            pulled: set[str] = set()
 
-            # CRITICAL: Save checkpoint immediately after getting batch_id
+            def settled(custom_id: str) -> bool:
+                return custom_id in pulled or self._is_finished(*chunk_mapping[custom_id])
+
+            puller = None
+            pulling = asyncio.Event()
+            if deadline is not None:
+                puller = asyncio.create_task(
+                    self._pull_before_deadline(
+                        request_ids,
+                        chunk_mapping,
+                        pulled,
+                        pulling,
+                        deadline,
+                        checkpoint_mgr,
+                        target_language,
+                        source_language,
+                        poll_interval,
+                        progress,
+                    )
+                )
+
+            try:
+                batch_ids = await self._run_batches(
+                    shards,
+                    checkpoint_mgr,
+                    template,
+                    poll_interval,
+                    progress,
+                    verbose,
+                    on_result,
+                    settled,
+                    on_harvest,
+                )
+                if puller is not None and pulling.is_set():
+                    # Let the chunks already pulled finish
+                    await puller
+            finally:
+                if puller is not None and not puller.done():
+                    puller.cancel()
+                    await asyncio.gather(puller, return_exceptions=True)
+
+            await self._translate_failed(
+                request_ids,
+                chunk_mapping,
+                checkpoint_mgr,
+                target_language,
+                source_language,
+                progress,
+            )
+            return batch_ids
+        except BaseException:
+            self._abort_outputs(files)
+            raise
+        finally:
+            self.expansion.save()
+            self.llm.save_token_rates()
+
+    async def _run_batches(
+        self,
+        shards: list[list[BatchRequest]],
+        checkpoint_mgr: CheckpointManager,
+        template: CheckpointData,
+        poll_interval: int,
+        progress: Progress | None,
+        verbose: bool,
+        on_result: Callable[[BatchResult], Awaitable[None]],
+        settled: Callable[[str], bool] | None = None,
+        on_harvest: Callable[[], None] | None = None,
+    ) -> list[str]:
+        """
+        Submit one batch per shard (unless resuming it), poll them concurrently and stream their results.
+
+        Args:
+            shards: Requests of each batch.
+            checkpoint_mgr: Checkpoint manager for the job.
+            template: Checkpoint data saved at each stage; its batch_ids, if
+                set, are the batches to resume (None for shards to submit).
+            poll_interval: Longest wait between status checks of a batch;
+                checks are more frequent while a batch is starting or
+                making progress.
+            progress: Optional Rich progress instance.
+            verbose: Enable verbose output.
+            on_result: Called with each result as it is downloaded.
+            settled: Whether a request no longer needs its result, e.g. one
+                processed before an interruption; batches holding only these
+                are not downloaded, and are canceled if still running.
+            on_harvest: Called once each batch's results are processed.
+
+        Returns:
+            The batch IDs, in shard order.
+        """
+        batch_ids: list[str | None] = list(template.batch_ids or [None] * len(shards))
+        completed = [0] * len(shards)
+        saved: tuple | None = None
+
+        def save(stage: str, last_completed_chunk: int) -> None:
+            # Progress is read back from the provider on resume, so the
+            # checkpoint is only rewritten when the stage or batches change
+            nonlocal saved
+            if saved == (stage, *batch_ids):
+                return
+            saved = (stage, *batch_ids)
             checkpoint_mgr.save(
-                CheckpointData(
-                    engine_type="batch",
-                    input_path=str(input_path),
-                    output_path=str(output_path),
-                    target_language=target_language,
-                    source_language=source_language,
-                    chunk_size=self.chunker.max_tokens,
-                    last_completed_chunk=-1,
-                    total_chunks=len(chunks),
-                    translated_segments=[],
-                    context_history=[],
-                    batch_id=batch_id,
-                    batch_stage="submitted",
-                    chunk_mapping=chunk_mapping_serialized,
+                replace(
+                    template,
+                    batch_id=batch_ids[0],
+                    batch_ids=list(batch_ids),
+                    batch_stage=stage,
+                    last_completed_chunk=last_completed_chunk,
                 )
             )
 
-        # 5. Poll for completion
+        # Submit batches (if not resuming)
+        for k, shard in enumerate(shards):
+            if batch_ids[k] is not None:
+                continue
+            if progress:
+                label = f" {k + 1}/{len(shards)}" if len(shards) > 1 else ""
+                progress.console.print(f"Submitting batch{label} with {len(shard)} requests...")
+            batch_ids[k] = await self.llm.create_batch(shard)
+            if progress:
+                progress.console.print(f"Batch created: {batch_ids[k]}")
+
+            # CRITICAL: Save checkpoint immediately after getting each batch_id
+            save("submitted", -1)
+
+        # Poll every batch for completion
         task_id = None
         if progress:
             task_id = progress.add_task(
                 "Waiting for batch completion",
-                total=len(batch_requests),
+                total=sum(len(shard) for shard in shards),
             )
 
-        while True:
-            status = await self.llm.get_batch_status(batch_id)
-            if progress and task_id is not None:
-                progress.update(task_id, completed=status.completed)
+        async def poll(k: int) -> None:
+            batch_id = batch_ids[k]
+            schedule = PollSchedule(self.MIN_POLL_INTERVAL, poll_interval)
+            while True:
+                if settled is not None and all(settled(r.custom_id) for r in shards[k]):
+                    status = await self.llm.get_batch_status(batch_id)
+                    if not status.finished:
+                        if progress:
+                            progress.console.print(
+                                f"Canceling batch {batch_id}: its remaining requests "
+                                "are translated in real time"
+                            )
+                        await self.llm.cancel_batch(batch_id)
+                    completed[k] = len(shards[k])
+                    if progress and task_id is not None:
+                        progress.update(task_id, completed=sum(completed))
+                    return
 
-            # Update checkpoint during polling
-            checkpoint_mgr.save(
-                CheckpointData(
-                    engine_type="batch",
-                    input_path=str(input_path),
-                    output_path=str(output_path),
-                    target_language=target_language,
-                    source_language=source_language,
-                    chunk_size=self.chunker.max_tokens,
-                    last_completed_chunk=status.completed - 1,
-                    total_chunks=len(chunks),
-                    translated_segments=[],
-                    context_history=[],
-                    batch_id=batch_id,
-                    batch_stage="polling",
-                    chunk_mapping=chunk_mapping_serialized,
+                status = await self.llm.get_batch_status(batch_id)
+                completed[k] = status.completed
+                if progress and task_id is not None:
+                    progress.update(task_id, completed=sum(completed))
+
+                # Record the polling stage in the checkpoint
+                save("polling", sum(completed) - 1)
+
+                if status.finished:
+                    if status.status != "completed" and progress:
+                        progress.console.print(
+                            f"[yellow]Warning: batch {batch_id} {status.status} with "
+                            f"{status.completed}/{status.total} requests completed[/yellow]"
+                        )
+                    break
+
+                if self.notifier is not None:
+                    wait = poll_interval
+                else:
+                    wait = schedule.next_interval(
+                        status.completed, status.total, time.monotonic()
+                    )
+                if verbose and progress:
+                    progress.console.print(
+                        f"Status of {batch_id}: {status.status} "
+                        f"({status.completed}/{status.total}), next check in {wait:.0f}s"
+                    )
+
+                if self.notifier is not None:
+                    await self.notifier.wait(batch_id, wait)
+                else:
+                    await asyncio.sleep(wait)
+
+            # Stream this batch's results while the others are still polled
+            if progress:
+                progress.console.print(f"Fetching results of {batch_id}...")
+            async for result in self.llm.iter_batch_results(batch_id):
+                await on_result(result)
+            if on_harvest is not None:
+                on_harvest()
+
+        # A failing batch cancels the others' polling, so nothing is written
+        # once the job is aborted
+        await run_bounded(range(len(shards)), poll, len(shards))
+
+        # Update checkpoint after fetching results
+        save("results_fetched", template.total_chunks - 1)
+        return batch_ids
+
+    async def _apply_result(
+        self,
+        result: BatchResult,
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        checkpoint_mgr: CheckpointManager,
+        target_language: str,
+        source_language: str | None,
+        progress: Progress | None,
+    ) -> None:
+        """
+        Finish the chunk a batch result belongs to and write its file as far as possible.
+
+        The chunk's translated parts are recorded in the checkpoint, so it is
+        not downloaded or repaired again after an interruption. A chunk whose
+        request failed, or whose segments cannot be aligned, is left for
+        `_translate_failed`.
+        """
+        if result.custom_id not in chunk_mapping:
+            return
+        file, chunk = chunk_mapping[result.custom_id]
+        if self._is_finished(file, chunk):
+            # Already processed, e.g. harvested before an interruption
+            return
+
+        if not result.translated_text:
+            if result.error and progress:
+                progress.console.print(
+                    f"[yellow]Warning: {result.custom_id} failed: {result.error}; "
+                    "retrying in real time[/yellow]"
                 )
+            return
+
+        texts = [s.text for s in chunk.segments if not s.skip_translation]
+        translated_parts = parse_numbered(result.translated_text, len(texts))
+        partial = False
+        if result.truncated:
+            # Re-translate the chunk's halves in real time rather than
+            # keeping the cut-off text
+            incomplete: list[Chunk] = []
+            resplit = await self._translate_truncated(
+                chunk, target_language, source_language, incomplete, progress
             )
+            if resplit is not None:
+                translated_parts = resplit
+                file.resplit_chunks += 1
+                partial = bool(incomplete)
+            else:
+                translated_parts = [
+                    part if part is not None else text
+                    for text, part in zip(texts, translated_parts)
+                ]
+                partial = True
+        else:
+            # Re-request, in real time, only segments whose markers
+            # are missing from the result
+            try:
+                translated_parts = await repair_alignment(
+                    texts,
+                    translated_parts,
+                    self._translator(target_language, source_language),
+                )
+            except MissingSegmentsError as e:
+                if progress:
+                    progress.console.print(
+                        f"[yellow]Warning: {result.custom_id}: {e}; "
+                        "retrying in real time[/yellow]"
+                    )
+                return
+        self._finish_chunk(
+            result.custom_id,
+            file,
+            chunk,
+            translated_parts,
+            checkpoint_mgr,
+            target_language,
+            source_language,
+            partial=partial,
+        )
 
-            if status.status == "completed":
-                break
+    @staticmethod
+    def _is_finished(file: _BatchFile, chunk: Chunk) -> bool:
+        """Whether a chunk's translation has been settled, written or not."""
+        return (
+            file.done
+            or chunk.chunk_index < file.written
+            or chunk.chunk_index in file.translations
+        )
 
-            if verbose and progress:
-                progress.console.print(
-                    f"Status: {status.status} ({status.completed}/{status.total})"
+    def _finish_chunk(
+        self,
+        custom_id: str,
+        file: _BatchFile,
+        chunk: Chunk,
+        translated_parts: list[str],
+        checkpoint_mgr: CheckpointManager,
+        target_language: str,
+        source_language: str | None,
+        partial: bool = False,
+    ) -> bool:
+        """
+        Store a chunk's translation, record it and write its file as far as possible.
+
+        A partial translation, e.g. cut off by the output limit or keeping the
+        source text of dropped segments, is used for this run but neither kept
+        in translation memory nor learned from.
+
+        Returns:
+            Whether the translation was used; a chunk translated both in the
+            batch and in real time keeps the first translation to finish.
+        """
+        if self._is_finished(file, chunk):
+            return False
+        texts = [s.text for s in chunk.segments if not s.skip_translation]
+        file.translations[chunk.chunk_index] = translated_parts
+        if not partial:
+            if self.memory is not None:
+                self.memory.remember(
+                    texts,
+                    translated_parts,
+                    target_language,
+                    source_language,
+                    self.llm.model_id,
                 )
+            self.expansion.observe(
+                self.llm.model_id,
+                target_language,
+                chunk.token_count,
+                self.llm.count_tokens("\n\n".join(translated_parts)),
+            )
+        checkpoint_mgr.append_result(custom_id, translated_parts)
+        self._write_ready(file)
+        return True
+
+    async def _translate_failed(
+        self,
+        request_ids: list[str],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        checkpoint_mgr: CheckpointManager,
+        target_language: str,
+        source_language: str | None,
+        progress: Progress | None,
+    ) -> None:
+        """
+        Translate, in real time, the chunks of requests the batches left without a result.
+
+        These are requests that failed, expired or were canceled, and any
+        whose result is missing. At most `concurrency` chunks are translated at
+        once. A chunk that still cannot be translated keeps its original
+        segments.
 
-            await asyncio.sleep(poll_interval)
+        Args:
+            request_ids: IDs of the job's batch requests.
+            chunk_mapping: custom_id -> (file, chunk).
+            checkpoint_mgr: Checkpoint manager for the job.
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+            progress: Optional Rich progress instance.
+        """
+        failed = [
+            custom_id
+            for custom_id in request_ids
+            if not self._is_finished(*chunk_mapping[custom_id])
+        ]
+        if not failed:
+            return
 
-        # 6. Get results
+        task_id = None
         if progress:
-            progress.console.print("Fetching results...")
-        results = await self.llm.get_batch_results(batch_id)
+            progress.console.print(
+                f"Translating {len(failed)} failed batch requests in real time..."
+            )
+            task_id = progress.add_task("Real-time fallback", total=len(failed))
 
-        # Update checkpoint after fetching results
-        checkpoint_mgr.save(
-            CheckpointData(
-                engine_type="batch",
-                input_path=str(input_path),
-                output_path=str(output_path),
+        async def translate(custom_id: str) -> None:
+            file, chunk = chunk_mapping[custom_id]
+            if await self._translate_request(
+                custom_id,
+                chunk_mapping,
+                checkpoint_mgr,
+                target_language,
+                source_language,
+                progress,
+            ):
+                file.fallback_chunks += 1
+            elif not self._is_finished(file, chunk):
+                # Keep the original
+                file.translations[chunk.chunk_index] = None
+                self._write_ready(file)
+            if progress and task_id is not None:
+                progress.advance(task_id)
+
+        await run_bounded(failed, translate, self.concurrency)
+
+    async def _pull_before_deadline(
+        self,
+        request_ids: list[str],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        pulled: set[str],
+        pulling: asyncio.Event,
+        deadline: datetime,
+        checkpoint_mgr: CheckpointManager,
+        target_language: str,
+        source_language: str | None,
+        poll_interval: int,
+        progress: Progress | None,
+    ) -> None:
+        """
+        Move chunks still waiting on their batch to real-time translation as a deadline nears.
+
+        Waits until translating those chunks in real time, `concurrency` at a
+        time, would only just finish by the deadline. From then on, each free
+        slot takes the next waiting chunk in document order, so chunks whose
+        batch results arrive in the meantime are not translated twice.
+
+        Args:
+            request_ids: IDs of the job's batch requests, in document order.
+            chunk_mapping: custom_id -> (file, chunk).
+            pulled: IDs of the requests taken over; extended as chunks are pulled.
+            pulling: Set once chunks start being pulled.
+            deadline: Time the job should be finished by.
+            checkpoint_mgr: Checkpoint manager for the job.
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+            poll_interval: Longest wait between checks of the schedule.
+            progress: Optional Rich progress instance.
+        """
+
+        def waiting() -> Iterator[str]:
+            for custom_id in request_ids:
+                if custom_id not in pulled and not self._is_finished(*chunk_mapping[custom_id]):
+                    yield custom_id
+
+        # Deadline on the monotonic clock, unaffected by changes to the wall clock
+        end = time.monotonic() + (deadline - datetime.now(deadline.tzinfo)).total_seconds()
+        while True:
+            remaining = sum(1 for _ in waiting())
+            if not remaining:
+                return
+            needed = (
+                math.ceil(remaining / self.concurrency)
+                * self.REALTIME_CHUNK_SECONDS
+                * self.DEADLINE_SAFETY
+            )
+            slack = end - time.monotonic() - needed
+            if slack <= 0:
+                break
+            await asyncio.sleep(min(slack, poll_interval))
+
+        pulling.set()
+        task_id = None
+        if progress:
+            progress.console.print(
+                f"[yellow]Deadline approaching: translating the {remaining} chunks "
+                "still in batches in real time[/yellow]"
+            )
+            task_id = progress.add_task("Translating before the deadline", total=remaining)
+
+        def pull() -> Iterator[str]:
+            # Pulled lazily, as slots free up, skipping chunks whose batch
+            # results arrived in the meantime
+            for custom_id in waiting():
+                pulled.add(custom_id)
+                yield custom_id
+
+        async def translate(custom_id: str) -> None:
+            file, _ = chunk_mapping[custom_id]
+            if await self._translate_request(
+                custom_id,
+                chunk_mapping,
+                checkpoint_mgr,
+                target_language,
+                source_language,
+                progress,
+            ):
+                file.pulled_chunks += 1
+            if progress and task_id is not None:
+                progress.advance(task_id)
+
+        await run_bounded(pull(), translate, self.concurrency)
+        if progress and task_id is not None:
+            progress.update(task_id, total=len(pulled), completed=len(pulled))
+
+    async def _translate_request(
+        self,
+        custom_id: str,
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        checkpoint_mgr: CheckpointManager,
+        target_language: str,
+        source_language: str | None,
+        progress: Progress | None,
+    ) -> bool:
+        """
+        Translate a batch request's chunk in real time and finish it.
+
+        Returns:
+            Whether the chunk was finished with this translation; False if it
+            failed, or if its batch result was used instead.
+        """
+        file, chunk = chunk_mapping[custom_id]
+        incomplete: list[Chunk] = []
+        try:
+            translated_parts = await self._translate_realtime(
+                chunk, target_language, source_language, incomplete, progress
+            )
+        except Exception as e:
+            if progress:
+                progress.console.print(
+                    f"[yellow]Warning: {custom_id} failed in real time: {e}[/yellow]"
+                )
+            return False
+        return self._finish_chunk(
+            custom_id,
+            file,
+            chunk,
+            translated_parts,
+            checkpoint_mgr,
+            target_language,
+            source_language,
+            partial=bool(incomplete),
+        )
+
+    def _translator(
+        self,
+        target_language: str,
+        source_language: str | None,
+    ) -> Callable[[str], Awaitable[str]]:
+        """Get a function translating one request's text in real time."""
+
+        async def translate(text: str) -> str:
+            return await self.llm.translate(
+                text=text,
                 target_language=target_language,
                 source_language=source_language,
-                chunk_size=self.chunker.max_tokens,
-                last_completed_chunk=len(chunks) - 1,
-                total_chunks=len(chunks),
-                translated_segments=[],
-                context_history=[],
-                batch_id=batch_id,
-                batch_stage="results_fetched",
-                chunk_mapping=chunk_mapping_serialized,
             )
-        )
 
-        # 7. Build result mapping
-        translations: dict[str, str] = {}
-        for result in results:
-            if result.translated_text:
-                translations[result.custom_id] = result.translated_text
-            elif result.error:
+        return translate
+
+    def _chunk_translator(
+        self,
+        target_language: str,
+        source_language: str | None,
+        incomplete: list[Chunk],
+        progress: Progress | None,
+    ) -> Callable[[Chunk], Awaitable[list[TextSegment]]]:
+        """
+        Get a function translating a chunk in real time with numbered segment markers.
+
+        Segments the model keeps dropping keep their source text rather than
+        failing the chunk; chunks (or parts) this happens to are appended to
+        `incomplete`.
+        """
+        translate_text = self._translator(target_language, source_language)
+
+        async def translate(part: Chunk) -> list[TextSegment]:
+            try:
+                translated_parts = await translate_aligned(
+                    [s.text for s in part.segments if not s.skip_translation],
+                    translate_text,
+                )
+            except MissingSegmentsError as e:
                 if progress:
                     progress.console.print(
-                        f"[yellow]Warning: {result.custom_id} failed: {result.error}[/yellow]"
+                        f"[yellow]Warning: chunk-{part.chunk_index}: {e}; "
+                        "keeping the source text[/yellow]"
                     )
+                translated_parts = e.keep_source()
+                incomplete.append(part)
+            return reassemble_chunk(part, translated_parts)
 
-        # 8. Reconstruct segments
-        translated_segments: list[TextSegment] = []
-        for i, chunk in enumerate(chunks):
-            custom_id = f"chunk-{i}"
-            translation = translations.get(custom_id)
-
-            if translation:
-                # Split translated text back into segments
-                translated_parts = translation.split("\n\n")
-                trans_idx = 0
-
-                for segment in chunk.segments:
-                    if segment.skip_translation:
-                        translated_segments.append(segment)
-                    else:
-                        translated_segment = TextSegment(
-                            text=(
-                                translated_parts[trans_idx]
-                                if trans_idx < len(translated_parts)
-                                else ""
-                            ),
-                            metadata=segment.metadata.copy(),
-                            segment_type=segment.segment_type,
-                        )
-                        translated_segments.append(translated_segment)
-                        trans_idx += 1
+        return translate
+
+    @retry(
+        wait=wait_exponential_jitter(initial=1, max=60, jitter=5),
+        stop=stop_after_attempt(5),
+        # Truncation is handled by re-splitting the chunk, not by retrying it
+        retry=retry_if_not_exception_type(TranslationTruncatedError),
+        reraise=True,
+    )
+    async def _translate_realtime(
+        self,
+        chunk: Chunk,
+        target_language: str,
+        source_language: str | None,
+        incomplete: list[Chunk],
+        progress: Progress | None,
+    ) -> list[str]:
+        """
+        Translate a chunk in real time with retry logic, re-splitting it if truncated.
+
+        Returns:
+            Translated parts of the chunk's translatable segments; see
+            `_chunk_translator` for `incomplete`.
+        """
+        translated_chunk = await translate_resplitting(
+            chunk,
+            self._chunk_translator(target_language, source_language, incomplete, progress),
+        )
+        return [
+            segment.text
+            for segment, original in zip(translated_chunk, chunk.segments)
+            if not original.skip_translation
+        ]
+
+    async def _translate_truncated(
+        self,
+        chunk: Chunk,
+        target_language: str,
+        source_language: str | None,
+        incomplete: list[Chunk],
+        progress: Progress | None,
+    ) -> list[str] | None:
+        """
+        Translate a chunk whose batch result was truncated, half by half.
+
+        Returns:
+            Translated parts of the chunk's translatable segments, or None if
+            the chunk could not be fully translated; see `_chunk_translator`
+            for `incomplete`.
+        """
+        try:
+            translated_chunk = await translate_halves(
+                chunk,
+                self._chunk_translator(target_language, source_language, incomplete, progress),
+            )
+        except TranslationTruncatedError:
+            translated_chunk = None
+        if translated_chunk is None:
+            if progress:
+                progress.console.print(
+                    f"[yellow]Warning: chunk-{chunk.chunk_index} was truncated and "
+                    "could not be split further; keeping the partial translation[/yellow]"
+                )
+            return None
+
+        return [
+            segment.text
+            for segment, original in zip(translated_chunk, chunk.segments)
+            if not original.skip_translation
+        ]
+
+    @staticmethod
+    def _write_ready(file: _BatchFile, final: bool = False) -> None:
+        """
+        Write a file's finished chunks that are next in document order.
+
+        The writer is opened with the first chunk written and closed after the
+        last, and each chunk's translation is released once written.
+
+        Args:
+            file: The file to write.
+            final: No more results will arrive; chunks without a translation
+                keep their original segments.
+        """
+        while file.written < len(file.chunks) and (
+            final or file.written in file.translations
+        ):
+            chunk = file.chunks[file.written]
+            translated_parts = file.translations.pop(file.written, None)
+            if translated_parts:
+                translated_chunk = reassemble_chunk(chunk, translated_parts)
             else:
                 # No translation available, keep original
-                translated_segments.extend(chunk.segments)
+                translated_chunk = chunk.segments
+            if file.writer is None:
+                file.writer = file.parser.open_writer(file.output_path, file.input_path)
+            file.writer.write_segments(translated_chunk)
+            file.output_chars += sum(len(s.text) for s in translated_chunk)
+            file.written += 1
 
-        # 9. Write output
-        self.parser.write(translated_segments, output_path, input_path)
+        if file.written == len(file.chunks) and not file.done:
+            if file.writer is None:
+                # Nothing to write, e.g. an empty file
+                file.writer = file.parser.open_writer(file.output_path, file.input_path)
+            file.writer.close()
+            file.done = True
 
-        # 10. Clean up checkpoint on success
-        checkpoint_mgr.clean()
+    def _write_partial(
+        self,
+        file: _BatchFile,
+        partial_path: Path,
+        results: dict[str, list[str] | None],
+        chunk_mapping: dict[str, tuple[_BatchFile, Chunk]],
+        target_language: str,
+        source_language: str | None,
+    ) -> None:
+        """
+        Write a preview of a file with the results harvested so far.
 
-        # 11. Calculate stats
-        total_input = sum(len(s.text) for s in segments)
-        total_output = sum(len(s.text) for s in translated_segments)
+        Chunks without a result keep their source text, unless they were
+        recalled from translation memory.
 
-        result = {
-            "input_chars": total_input,
-            "output_chars": total_output,
-            "chunks": len(chunks),
-            "batch_id": batch_id,
+        Args:
+            file: The file being translated.
+            partial_path: Path to write the preview to.
+            results: Recorded translated parts by request ID.
+            chunk_mapping: custom_id -> (file, chunk).
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+        """
+        request_ids = {
+            chunk.chunk_index: custom_id
+            for custom_id, (owner, chunk) in chunk_mapping.items()
+            if owner is file
         }
-        if resumed:
-            result["resumed"] = True
-        return result
+        with file.parser.open_writer(partial_path, file.input_path) as writer:
+            for chunk in file.chunks:
+                texts = [s.text for s in chunk.segments if not s.skip_translation]
+                if chunk.chunk_index in request_ids:
+                    translated_parts = results.get(request_ids[chunk.chunk_index])
+                elif texts and self.memory is not None:
+                    translated_parts = self.memory.recall(
+                        texts, target_language, source_language, self.llm.model_id
+                    )
+                else:
+                    translated_parts = None
+                if translated_parts:
+                    writer.write_segments(reassemble_chunk(chunk, translated_parts))
+                else:
+                    writer.write_segments(chunk.segments)
+
+    @staticmethod
+    def _abort_outputs(files: list[_BatchFile]) -> None:
+        """Discard the outputs of files that were not completed."""
+        for file in files:
+            if file.writer is not None and not file.done:
+                file.writer.abort()
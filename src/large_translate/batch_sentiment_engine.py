@@ -123,7 +123,8 @@ class BatchSentimentEngine:
             if progress and task_id is not None:
                 progress.update(task_id, completed=status.completed)
 
-            if status.status == "completed":
+            # Failed, expired or canceled batches still return what completed
+            if status.finished:
                 break
 
             if verbose and progress:
@@ -133,6 +134,12 @@ class BatchSentimentEngine:
 
             await asyncio.sleep(poll_interval)
 
+        if status.status != "completed" and progress:
+            progress.console.print(
+                f"[yellow]Warning: batch {status.status}; "
+                f"{status.total - status.completed} requests have no results[/yellow]"
+            )
+
         # 6. Get results
         if progress:
             progress.console.print("Fetching results...")
@@ -3,6 +3,7 @@
 import json
 import os
 import tempfile
+from collections import deque
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
@@ -19,32 +20,58 @@ class CheckpointData:
     source_language: str | None
     chunk_size: int
     last_completed_chunk: int
-    total_chunks: int
+    total_chunks: int  # 0 if chunks are produced lazily and the total is unknown
     translated_segments: list[dict[str, Any]]  # Serialized TextSegments
     context_history: list[str]  # For context continuity
     # Batch-specific fields
     batch_id: str | None = None
     batch_stage: str | None = None  # "submitted", "polling", "results_fetched"
+    # One ID per shard of a job split across several provider batches; None
+    # for shards not yet submitted. batch_id is the first shard's ID.
+    batch_ids: list[str | None] | None = None
     # Chunk mapping for batch mode
     chunk_mapping: dict[str, Any] | None = None
+    # Size of the input file in bytes, to detect a changed input on resume
+    input_size: int | None = None
+    # Token estimation rates chunks were sized with (see
+    # BaseLLMProvider.token_rates), so a resumed run chunks identically
+    token_rates: dict[str, float] | None = None
 
 
 class CheckpointManager:
-    """Manages checkpoint files for translation recovery."""
+    """
+    Manages checkpoint files for translation recovery.
+
+    A checkpoint is a JSON snapshot plus an append-only JSONL journal of chunks
+    completed since the snapshot. Appending a chunk writes only that chunk's
+    record; the journal is periodically compacted into a new snapshot.
+
+    Batch jobs also record each processed result, by request ID, in a separate
+    results journal that snapshots leave untouched.
+    """
+
+    # Journal records appended between automatic compactions
+    COMPACT_EVERY = 500
 
-    def __init__(self, output_path: Path):
+    def __init__(self, output_path: Path, context_window: int | None = None):
         """
         Initialize checkpoint manager.
 
         Args:
             output_path: Path to the output file (checkpoint stored alongside).
+            context_window: Number of context history entries to keep when
+                loading (all if None).
         """
         self.output_path = output_path
         self.checkpoint_path = output_path.parent / f"{output_path.stem}.checkpoint.json"
+        self.journal_path = output_path.parent / f"{output_path.stem}.checkpoint.jsonl"
+        self.results_path = output_path.parent / f"{output_path.stem}.checkpoint.results.jsonl"
+        self.context_window = context_window
+        self._appended = 0
 
     def save(self, data: CheckpointData) -> None:
         """
-        Save checkpoint data atomically.
+        Save a full checkpoint snapshot atomically and reset the journal.
 
         Uses write-to-temp-then-rename pattern to prevent corruption.
         """
@@ -68,6 +95,40 @@ class CheckpointManager:
                 os.unlink(temp_path)
             raise
 
+        # The snapshot now covers everything journaled so far. Records left over
+        # from a crash before this point are skipped on replay by chunk index.
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._appended = 0
+
+    def append(
+        self,
+        chunk_index: int,
+        segments: list[dict[str, Any]],
+        context: str | None = None,
+    ) -> None:
+        """
+        Record one completed chunk in the journal.
+
+        Args:
+            chunk_index: Index of the completed chunk.
+            segments: The chunk's serialized translated segments.
+            context: Context history entry added for this chunk, if any.
+        """
+        record = {"chunk_index": chunk_index, "segments": segments, "context": context}
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        self._appended += 1
+        if self._appended >= self.COMPACT_EVERY:
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot."""
+        data = self.load()
+        if data is not None:
+            self.save(data)
+
     def load(self) -> CheckpointData | None:
         """
         Load checkpoint if it exists.
@@ -81,19 +142,86 @@ class CheckpointManager:
         try:
             with open(self.checkpoint_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            return CheckpointData(**data)
+            checkpoint = CheckpointData(**data)
         except (json.JSONDecodeError, TypeError, KeyError):
             # Invalid checkpoint file
             return None
 
+        self._replay_journal(checkpoint)
+        return checkpoint
+
+    def _replay_journal(self, checkpoint: CheckpointData) -> None:
+        """Apply journaled chunks that are newer than the snapshot."""
+        if not self.journal_path.exists():
+            return
+
+        context_history = deque(checkpoint.context_history, maxlen=self.context_window)
+        with open(self.journal_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    chunk_index = record["chunk_index"]
+                    segments = record["segments"]
+                except (json.JSONDecodeError, UnicodeDecodeError, TypeError, KeyError):
+                    # Torn write from a crash mid-append: drop it so later
+                    # appends start on a clean line
+                    os.truncate(self.journal_path, offset)
+                    break
+                offset += len(line)
+                if chunk_index <= checkpoint.last_completed_chunk:
+                    continue
+                checkpoint.translated_segments.extend(segments)
+                if record.get("context"):
+                    context_history.append(record["context"])
+                checkpoint.last_completed_chunk = chunk_index
+        checkpoint.context_history = list(context_history)
+
+    def append_result(self, custom_id: str, value: Any) -> None:
+        """
+        Record one processed batch result.
+
+        Args:
+            custom_id: ID of the batch request.
+            value: JSON-serializable result.
+        """
+        record = {"custom_id": custom_id, "value": value}
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def load_results(self) -> dict[str, Any]:
+        """
+        Load the recorded batch results.
+
+        Returns:
+            Result by request ID; empty if none were recorded.
+        """
+        results = {}
+        if not self.results_path.exists():
+            return results
+
+        with open(self.results_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    results[record["custom_id"]] = record["value"]
+                except (json.JSONDecodeError, UnicodeDecodeError, TypeError, KeyError):
+                    # Torn write from a crash mid-append
+                    os.truncate(self.results_path, offset)
+                    break
+                offset += len(line)
+        return results
+
     def exists(self) -> bool:
         """Check if a checkpoint file exists."""
         return self.checkpoint_path.exists()
 
     def clean(self) -> None:
-        """Remove checkpoint file after successful completion."""
-        if self.checkpoint_path.exists():
-            self.checkpoint_path.unlink()
+        """Remove checkpoint files after successful completion."""
+        for path in (self.checkpoint_path, self.journal_path, self.results_path):
+            if path.exists():
+                path.unlink()
 
 
 def serialize_segment(segment: Any) -> dict[str, Any]:
@@ -1,6 +1,12 @@
 """Chunking strategy and context management for translation."""
 
+import itertools
+import math
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
+from enum import Enum
 from typing import Callable
 
 from .parsers.base import TextSegment
@@ -13,19 +19,169 @@ class Chunk:
     segments: list[TextSegment]
     token_count: int
     chunk_index: int
-    total_chunks: int = 0
+    total_chunks: int = 0  # 0 when produced lazily and the total is not yet known
+
+
+def reassemble_chunk(chunk: Chunk, translated_parts: list[str]) -> list[TextSegment]:
+    """
+    Merge translated parts back into a chunk's segments.
+
+    Segments marked skip_translation are kept as-is; the others take the next
+    translated part in order, or keep their source text if the translation has
+    fewer parts than segments.
+    """
+    result = []
+    trans_idx = 0
+
+    for segment in chunk.segments:
+        if segment.skip_translation:
+            result.append(segment)
+        else:
+            result.append(
+                TextSegment(
+                    text=(
+                        translated_parts[trans_idx]
+                        if trans_idx < len(translated_parts)
+                        else segment.text
+                    ),
+                    metadata=segment.metadata.copy(),
+                    segment_type=segment.segment_type,
+                )
+            )
+            trans_idx += 1
+
+    return result
+
+
+def split_chunk(chunk: Chunk) -> tuple[Chunk, Chunk] | None:
+    """
+    Split a chunk in half so that each half can be translated separately.
+
+    Chunks with several translatable segments are split at the segment
+    boundary nearest the middle. A chunk with a single translatable segment
+    has that segment's text split at the sentence (or failing that, word)
+    boundary nearest the middle, giving halves with one segment more than the
+    original between them; `join_split_chunk` merges it back. Token counts of
+    the halves are estimated in proportion to their characters.
+
+    Returns:
+        The two halves, or None if the chunk cannot be split further.
+    """
+    translatable = [i for i, s in enumerate(chunk.segments) if not s.skip_translation]
+
+    if len(translatable) >= 2:
+        cut = translatable[len(translatable) // 2]
+        first_segments = chunk.segments[:cut]
+        second_segments = chunk.segments[cut:]
+    elif len(translatable) == 1:
+        position = translatable[0]
+        segment = chunk.segments[position]
+        text = segment.text.strip()
+        boundaries = [m.end() for m in re.finditer(r"(?<=[.!?])\s+", text)] or [
+            m.end() for m in re.finditer(r"\s+", text)
+        ]
+        if not boundaries:
+            return None
+        middle = min(boundaries, key=lambda b: abs(b - len(text) / 2))
+        first_segments = chunk.segments[:position] + [
+            TextSegment(
+                text=text[:middle].strip(),
+                metadata=segment.metadata.copy(),
+                segment_type=segment.segment_type,
+            )
+        ]
+        second_segments = [
+            TextSegment(
+                text=text[middle:].strip(),
+                metadata=segment.metadata.copy(),
+                segment_type=segment.segment_type,
+            )
+        ] + chunk.segments[position + 1 :]
+    else:
+        return None
+
+    def chars(segments: list[TextSegment]) -> int:
+        return sum(len(s.text) for s in segments if not s.skip_translation)
+
+    first_tokens = round(
+        chunk.token_count * chars(first_segments) / max(1, chars(chunk.segments))
+    )
+    return (
+        Chunk(
+            segments=first_segments,
+            token_count=first_tokens,
+            chunk_index=chunk.chunk_index,
+            total_chunks=chunk.total_chunks,
+        ),
+        Chunk(
+            segments=second_segments,
+            token_count=chunk.token_count - first_tokens,
+            chunk_index=chunk.chunk_index,
+            total_chunks=chunk.total_chunks,
+        ),
+    )
+
+
+def join_split_chunk(
+    chunk: Chunk,
+    first: list[TextSegment],
+    second: list[TextSegment],
+) -> list[TextSegment]:
+    """
+    Join the translated halves of a chunk split by `split_chunk`.
+
+    Returns:
+        Translated segments matching the original chunk's segments one to one.
+    """
+    if len(first) + len(second) == len(chunk.segments):
+        return first + second
+
+    # The halves share a segment that was split mid-text
+    head, tail = first[-1], second[0]
+    merged = TextSegment(
+        text=f"{head.text} {tail.text}".strip(),
+        metadata=head.metadata.copy(),
+        segment_type=head.segment_type,
+    )
+    return first[:-1] + [merged] + second[1:]
 
 
 class ChunkingStrategy:
     """Intelligent chunking strategy for translation."""
 
+    # Segments read ahead and token-counted together by `iter_chunks`
+    COUNT_BATCH_SIZE = 256
+    # Fraction of the output budget a full chunk's translation is expected to use
+    OUTPUT_HEADROOM = 0.85
+
     def __init__(self, max_tokens: int):
         self.max_tokens = max_tokens
 
+    def with_output_budget(
+        self,
+        max_output_tokens: int,
+        expansion_ratio: float,
+    ) -> "ChunkingStrategy":
+        """
+        Get a strategy whose chunks should translate within the output budget.
+
+        Args:
+            max_output_tokens: The model's maximum output tokens per request.
+            expansion_ratio: Expected output tokens per source token for the
+                target language.
+
+        Returns:
+            A strategy with max_tokens capped so that a full chunk's expected
+            translation uses at most OUTPUT_HEADROOM of max_output_tokens.
+        """
+        budget = int(max_output_tokens * self.OUTPUT_HEADROOM / expansion_ratio)
+        return ChunkingStrategy(max_tokens=max(1, min(self.max_tokens, budget)))
+
     def chunk_segments(
         self,
         segments: list[TextSegment],
         token_counter: Callable[[str], int],
+        batch_counter: Callable[[list[str]], list[int]] | None = None,
     ) -> list[Chunk]:
         """
         Chunk segments intelligently:
@@ -33,55 +189,84 @@ class ChunkingStrategy:
         2. Keep related content together
         3. Handle large segments by splitting at sentence boundaries
         """
-        chunks = []
+        chunks = list(self.iter_chunks(segments, token_counter, batch_counter))
+
+        # Update total_chunks for all chunks
+        total = len(chunks)
+        for chunk in chunks:
+            chunk.total_chunks = total
+
+        return chunks
+
+    def iter_chunks(
+        self,
+        segments: Iterable[TextSegment],
+        token_counter: Callable[[str], int],
+        batch_counter: Callable[[list[str]], list[int]] | None = None,
+    ) -> Iterator[Chunk]:
+        """
+        Chunk segments lazily, yielding each chunk as soon as it is complete.
+
+        Produces the same chunks as `chunk_segments`, but consumes `segments`
+        incrementally, so only the chunk being built and a small read-ahead
+        window are held in memory. The total is not known up front, so
+        `total_chunks` is left at 0.
+
+        Args:
+            segments: Segments in document order.
+            token_counter: Counts tokens in one text.
+            batch_counter: Counts tokens in several texts at once. If given,
+                segments are read `COUNT_BATCH_SIZE` at a time and counted
+                together.
+        """
+        if batch_counter is None:
+
+            def batch_counter(texts: list[str]) -> list[int]:
+                return [token_counter(t) for t in texts]
+
+        chunk_index = 0
         current_segments: list[TextSegment] = []
         current_tokens = 0
 
-        for segment in segments:
+        for segment, segment_tokens in self._counted(segments, batch_counter):
             # Skip segments that shouldn't be translated (like code blocks)
             if segment.skip_translation:
                 # Add to current chunk as-is
                 current_segments.append(segment)
                 continue
 
-            segment_tokens = token_counter(segment.text)
-
             # If single segment exceeds max, split by sentences
             if segment_tokens > self.max_tokens:
                 # Flush current chunk first
                 if current_segments:
-                    chunks.append(
-                        Chunk(
-                            segments=current_segments,
-                            token_count=current_tokens,
-                            chunk_index=len(chunks),
-                        )
+                    yield Chunk(
+                        segments=current_segments,
+                        token_count=current_tokens,
+                        chunk_index=chunk_index,
                     )
+                    chunk_index += 1
                     current_segments = []
                     current_tokens = 0
 
                 # Split large segment by sentences
-                sub_segments = self._split_large_segment(segment, token_counter)
-                for sub in sub_segments:
-                    sub_tokens = token_counter(sub.text)
-                    chunks.append(
-                        Chunk(
-                            segments=[sub],
-                            token_count=sub_tokens,
-                            chunk_index=len(chunks),
-                        )
+                sub_segments = self._split_large_segment(segment, batch_counter)
+                for sub, sub_tokens in sub_segments:
+                    yield Chunk(
+                        segments=[sub],
+                        token_count=sub_tokens,
+                        chunk_index=chunk_index,
                     )
+                    chunk_index += 1
 
             elif current_tokens + segment_tokens > self.max_tokens:
                 # Flush current chunk and start new one
                 if current_segments:
-                    chunks.append(
-                        Chunk(
-                            segments=current_segments,
-                            token_count=current_tokens,
-                            chunk_index=len(chunks),
-                        )
+                    yield Chunk(
+                        segments=current_segments,
+                        token_count=current_tokens,
+                        chunk_index=chunk_index,
                     )
+                    chunk_index += 1
                 current_segments = [segment]
                 current_tokens = segment_tokens
 
@@ -91,78 +276,127 @@ class ChunkingStrategy:
 
         # Don't forget the last chunk
         if current_segments:
-            chunks.append(
-                Chunk(
-                    segments=current_segments,
-                    token_count=current_tokens,
-                    chunk_index=len(chunks),
-                )
+            yield Chunk(
+                segments=current_segments,
+                token_count=current_tokens,
+                chunk_index=chunk_index,
             )
 
-        # Update total_chunks for all chunks
-        total = len(chunks)
-        for chunk in chunks:
-            chunk.total_chunks = total
+    def _counted(
+        self,
+        segments: Iterable[TextSegment],
+        batch_counter: Callable[[list[str]], list[int]],
+    ) -> Iterator[tuple[TextSegment, int]]:
+        """Pair segments with their token counts (0 for skipped segments)."""
+        iterator = iter(segments)
+        while batch := list(itertools.islice(iterator, self.COUNT_BATCH_SIZE)):
+            counts = iter(
+                batch_counter([s.text for s in batch if not s.skip_translation])
+            )
+            for segment in batch:
+                yield segment, 0 if segment.skip_translation else next(counts)
 
-        return chunks
+    def estimate_chunks(self, input_bytes: int) -> int:
+        """
+        Roughly estimate the number of chunks for an input of the given size.
+
+        Assumes about 4 bytes per token; used only to size progress displays
+        before `iter_chunks` has seen the whole input.
+        """
+        return max(1, math.ceil(input_bytes / (4 * self.max_tokens)))
 
     def _split_large_segment(
         self,
         segment: TextSegment,
-        token_counter: Callable[[str], int],
-    ) -> list[TextSegment]:
-        """Split a large segment by sentences."""
-        import re
+        batch_counter: Callable[[list[str]], list[int]],
+    ) -> list[tuple[TextSegment, int]]:
+        """
+        Split a large segment by sentences.
+
+        Each sentence is counted once and sub-segment sizes are kept as running
+        sums, so the cost is linear in the segment length.
 
+        Returns:
+            (sub-segment, token count) pairs in order.
+        """
         sentences = re.split(r"(?<=[.!?])\s+", segment.text)
 
         sub_segments = []
-        current_text = ""
-
-        for sentence in sentences:
-            potential_text = (
-                f"{current_text} {sentence}".strip() if current_text else sentence
-            )
-
-            if token_counter(potential_text) > self.max_tokens:
-                if current_text:
-                    sub_segments.append(
-                        TextSegment(
-                            text=current_text.strip(),
-                            metadata=segment.metadata.copy(),
-                            segment_type=segment.segment_type,
-                        )
-                    )
-                current_text = sentence
-            else:
-                current_text = potential_text
+        current_sentences: list[str] = []
+        current_tokens = 0
 
-        if current_text:
+        def flush() -> None:
             sub_segments.append(
-                TextSegment(
-                    text=current_text.strip(),
-                    metadata=segment.metadata.copy(),
-                    segment_type=segment.segment_type,
+                (
+                    TextSegment(
+                        text=" ".join(current_sentences).strip(),
+                        metadata=segment.metadata.copy(),
+                        segment_type=segment.segment_type,
+                    ),
+                    current_tokens,
                 )
             )
 
+        for sentence, sentence_tokens in zip(sentences, batch_counter(sentences)):
+            if current_sentences and current_tokens + sentence_tokens > self.max_tokens:
+                flush()
+                current_sentences = []
+                current_tokens = 0
+            current_sentences.append(sentence)
+            current_tokens += sentence_tokens
+
+        if current_sentences:
+            flush()
+
         return sub_segments
 
 
+class ContextMode(str, Enum):
+    """Where cross-chunk context is taken from."""
+
+    # Tail of the previous chunk's translation; requires chunks to finish in order
+    TRANSLATED = "translated"
+    # Tail of the previous chunk's source text; known up front, so parallel-safe
+    SOURCE = "source"
+    # No cross-chunk context
+    NONE = "none"
+
+
 @dataclass
 class ContextManager:
-    """Manages context continuity across chunks for translation."""
+    """
+    Manages context continuity across chunks for translation.
+
+    Only the last `window` entries are kept, each trimmed to its final
+    `context_length` characters - the most `get_context` can ever use - so
+    memory and checkpointed history stay O(window) regardless of document size.
+    """
 
     context_length: int = 200
-    previous_translations: list[str] = field(default_factory=list)
+    mode: ContextMode = ContextMode.TRANSLATED
+    window: int = 2
+    previous_translations: deque[str] = field(init=False)
+    previous_sources: deque[str] = field(init=False)
+
+    def __post_init__(self):
+        self.window = max(1, self.window)
+        self.previous_translations = deque(maxlen=self.window)
+        self.previous_sources = deque(maxlen=self.window)
 
     def get_context(self, chunk_index: int) -> str | None:
         """Get context summary from previous chunks."""
-        if chunk_index == 0 or not self.previous_translations:
+        if self.mode == ContextMode.SOURCE:
+            history = self.previous_sources
+        elif self.mode == ContextMode.TRANSLATED:
+            history = self.previous_translations
+        else:
+            return None
+
+        if chunk_index == 0 or not history:
             return None
 
-        # Get text from recent translations
-        recent_text = " ".join(self.previous_translations[-2:])
+        # Get text from recent chunks
+        recent_text = " ".join(history)
 
         # Truncate to context length, trying to find a sentence boundary
         if len(recent_text) > self.context_length:
@@ -174,6 +408,28 @@ class ContextManager:
 
         return recent_text
 
-    def add_translation(self, translated_text: str) -> None:
-        """Add completed translation to context history."""
-        self.previous_translations.append(translated_text)
+    def add_translation(self, translated_text: str) -> str | None:
+        """
+        Add completed translation to context history.
+
+        Returns:
+            The entry stored in history, or None if this mode does not use
+            translations.
+        """
+        if self.mode != ContextMode.TRANSLATED or not translated_text:
+            return None
+        entry = translated_text[-self.context_length :]
+        self.previous_translations.append(entry)
+        return entry
+
+    def add_source(self, source_text: str) -> None:
+        """Add a dispatched chunk's source text to context history."""
+        if self.mode == ContextMode.SOURCE and source_text:
+            self.previous_sources.append(source_text[-self.context_length :])
+
+    def restore(self, history: list[str]) -> None:
+        """Restore translation history from the entries `add_translation` returned."""
+        self.previous_translations = deque(
+            (entry[-self.context_length :] for entry in history),
+            maxlen=self.window,
+        )
@@ -1,6 +1,7 @@
 """CLI entry point for the translation tool."""
 
 import asyncio
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 
@@ -22,11 +23,20 @@ from rich.progress import (
 
 from .batch_engine import BatchTranslationEngine
 from .batch_sentiment_engine import BatchSentimentEngine
+from .chunking import ContextMode
 from .config import get_settings
 from .engine import TranslationEngine
-from .models import AnthropicProvider, GoogleProvider, OpenAIProvider
+from .expansion import ExpansionRatios
+from .models import (
+    AnthropicProvider,
+    GoogleProvider,
+    OpenAIProvider,
+    RateLimiter,
+    TokenEstimator,
+)
 from .parsers import DocxParser, MarkdownParser, TxtParser
 from .sentiment_engine import SentimentEngine
+from .translation_memory import TranslationMemory
 
 app = typer.Typer(
     name="translate",
@@ -70,9 +80,112 @@ def get_parser(file_path: Path):
     return PARSERS[ext]()
 
 
-def get_provider(model: ModelProvider):
-    """Get the LLM provider instance."""
-    return PROVIDERS[model]()
+def get_provider(
+    model: ModelProvider,
+    requests_per_minute: int | None = None,
+    tokens_per_minute: int | None = None,
+):
+    """Get the LLM provider instance with a client-side rate limiter."""
+    rate_limiter = RateLimiter(
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+    )
+    provider_cls = PROVIDERS[model]
+    if model == ModelProvider.OPENAI:
+        # tiktoken counts OpenAI tokens exactly; there is nothing to calibrate
+        return provider_cls(rate_limiter=rate_limiter)
+
+    token_estimator = TokenEstimator(
+        provider_cls.MODEL_NAME,
+        cache_path=Path(get_settings().token_estimator_path).expanduser(),
+    )
+    return provider_cls(rate_limiter=rate_limiter, token_estimator=token_estimator)
+
+
+def language_slug(target_language: str) -> str:
+    """Short file-name-safe form of a language name."""
+    return target_language.lower().replace(" ", "_")[:10]
+
+
+def default_output_path(input_file: Path, target_language: str) -> Path:
+    """Get the default output path for a target language (input_<lang>.ext)."""
+    return input_file.with_stem(f"{input_file.stem}_{language_slug(target_language)}")
+
+
+def parse_deadline(value: str) -> datetime:
+    """
+    Parse a --deadline value.
+
+    Args:
+        value: A time of day ("18:00", the next time it occurs) or an ISO 8601
+            date and time ("2025-06-30T18:00").
+
+    Returns:
+        The deadline.
+
+    Raises:
+        ValueError: If the value is neither.
+    """
+    try:
+        time_of_day = datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        return datetime.fromisoformat(value)
+    deadline = datetime.combine(datetime.now().date(), time_of_day)
+    if deadline <= datetime.now():
+        deadline += timedelta(days=1)
+    return deadline
+
+
+def batch_mode_label(deadline: datetime | None) -> str:
+    """Describe batch mode for the summary printed before translating."""
+    if deadline is None:
+        return "Batch (50% cost, 24h turnaround)"
+    return f"Batch, deadline {deadline:%Y-%m-%d %H:%M} (real time as needed)"
+
+
+def print_translation_stats(stats: dict, output_file: Path) -> None:
+    """Print the statistics of a completed translation."""
+    console.print(f"  Input: {stats['input_chars']:,} characters")
+    console.print(f"  Output: {stats['output_chars']:,} characters")
+    console.print(f"  Chunks processed: {stats['chunks']}")
+    if stats.get("cached_chunks"):
+        console.print(f"  Chunks from memory: {stats['cached_chunks']}")
+    if stats.get("resplit_chunks"):
+        console.print(f"  Truncated chunks re-split: {stats['resplit_chunks']}")
+    if stats.get("fallback_chunks"):
+        console.print(f"  Batch requests retried in real time: {stats['fallback_chunks']}")
+    if stats.get("pulled_chunks"):
+        console.print(f"  Chunks moved to real time for the deadline: {stats['pulled_chunks']}")
+    if stats.get("reused_segments"):
+        console.print(f"  Segments reused: {stats['reused_segments']}")
+    if len(stats.get("batch_ids") or []) > 1:
+        console.print(f"  Batch IDs: {', '.join(stats['batch_ids'])}")
+    elif stats.get("batch_id"):
+        console.print(f"  Batch ID: {stats['batch_id']}")
+    console.print(f"  Output file: {output_file}")
+
+
+def collect_files(input_dir: Path, pattern: str, exclude: Path | None = None) -> list[Path]:
+    """
+    Find the files under a directory that a parser supports.
+
+    Args:
+        input_dir: Directory to search.
+        pattern: Glob relative to input_dir (e.g. "**/*" or "docs/*.md").
+        exclude: Directory whose files are skipped, such as an output
+            directory nested inside input_dir.
+
+    Returns:
+        Matching files in sorted order.
+    """
+    files = []
+    for path in sorted(input_dir.glob(pattern)):
+        if not path.is_file() or path.suffix.lower() not in PARSERS:
+            continue
+        if exclude is not None and path.is_relative_to(exclude):
+            continue
+        files.append(path)
+    return files
 
 
 def create_progress() -> Progress:
@@ -96,8 +209,16 @@ def translate(
         readable=True,
     ),
     target_language: str = typer.Argument(
-        ...,
-        help="Target language (e.g., 'Spanish', 'French', 'Japanese')",
+        None,
+        help="Target language (e.g., 'Spanish', 'French', 'Japanese'); omit with --targets",
+    ),
+    targets: str = typer.Option(
+        None,
+        "--targets",
+        help=(
+            "Comma-separated target languages translated in one run, each to "
+            "input_<lang>.ext (e.g. 'Spanish,French,German')"
+        ),
     ),
     output_file: Path = typer.Option(
         None,
@@ -121,7 +242,7 @@ def translate(
         4000,
         "--chunk-size",
         "-c",
-        help="Maximum tokens per chunk",
+        help="Maximum tokens per chunk (lowered if needed to fit the output budget)",
     ),
     verbose: bool = typer.Option(
         False,
@@ -138,99 +259,486 @@ def translate(
     poll_interval: int = typer.Option(
         60,
         "--poll-interval",
-        help="Seconds between batch status checks (batch mode only)",
+        help="Longest wait in seconds between batch status checks (batch mode only)",
+    ),
+    deadline_value: str = typer.Option(
+        None,
+        "--deadline",
+        help="Finish by this time (HH:MM or ISO 8601): batch mode, moving chunks to "
+        "real time as the deadline nears",
+    ),
+    partial: bool = typer.Option(
+        False,
+        "--partial",
+        help="Batch mode: keep output.partial.ext up to date with the results so far",
+    ),
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        "-j",
+        min=1,
+        help="Number of chunks translated in parallel (real-time mode, and failed batch requests)",
+    ),
+    context_mode: ContextMode = typer.Option(
+        ContextMode.TRANSLATED,
+        "--context",
+        help=(
+            "Cross-chunk context: previous translation (sequential), "
+            "previous source text (parallel-safe) or none (real-time mode only)"
+        ),
+    ),
+    context_window: int = typer.Option(
+        2,
+        "--context-window",
+        min=1,
+        help="Number of preceding chunks context is drawn from (real-time mode only)",
+    ),
+    rpm: int = typer.Option(
+        None,
+        "--rpm",
+        min=1,
+        help="Requests-per-minute budget (learned from provider headers if not set)",
+    ),
+    tpm: int = typer.Option(
+        None,
+        "--tpm",
+        min=1,
+        help="Tokens-per-minute budget (learned from provider headers if not set)",
+    ),
+    use_memory: bool = typer.Option(
+        True,
+        "--memory/--no-memory",
+        help="Reuse and store translations in the local translation memory",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Only translate segments that changed since --previous-source",
+    ),
+    previous_source: Path = typer.Option(
+        None,
+        "--previous-source",
+        help="Source file the previous translation was made from (incremental mode)",
+        exists=True,
+        readable=True,
+    ),
+    previous_output: Path = typer.Option(
+        None,
+        "--previous-output",
+        help="Previous translation to reuse (incremental mode, default: the output file)",
+        exists=True,
+        readable=True,
     ),
 ):
-    """Translate a file to the target language."""
+    """Translate a file to the target language(s)."""
     # Validate input file
     parser = get_parser(input_file)
 
-    # Generate output path if not specified
-    if output_file is None:
-        lang_slug = target_language.lower().replace(" ", "_")[:10]
-        output_file = input_file.with_stem(f"{input_file.stem}_{lang_slug}")
+    deadline = None
+    if deadline_value is not None:
+        try:
+            deadline = parse_deadline(deadline_value)
+        except ValueError:
+            console.print(f"[red]Error: invalid --deadline: {deadline_value}[/red]")
+            raise typer.Exit(1)
+        batch = True
+
+    target_languages = [t.strip() for t in (targets or "").split(",") if t.strip()]
+    if bool(target_language) == bool(target_languages):
+        console.print("[red]Error: specify either TARGET_LANGUAGE or --targets[/red]")
+        raise typer.Exit(1)
+    if len(target_languages) > 1:
+        if output_file is not None or incremental:
+            console.print(
+                "[red]Error: --output and --incremental take a single target language[/red]"
+            )
+            raise typer.Exit(1)
+        outputs = {
+            language: default_output_path(input_file, language)
+            for language in target_languages
+        }
+        if len(set(outputs.values())) < len(target_languages):
+            console.print("[red]Error: --targets contains duplicate languages[/red]")
+            raise typer.Exit(1)
+    else:
+        target_language = target_language or target_languages[0]
+        # Generate output path if not specified
+        if output_file is None:
+            output_file = default_output_path(input_file, target_language)
+        outputs = {target_language: output_file}
+
+    if incremental:
+        if previous_source is None:
+            console.print("[red]Error: --incremental requires --previous-source[/red]")
+            raise typer.Exit(1)
+        if previous_output is None:
+            previous_output = output_file
+        if not previous_output.exists():
+            console.print(f"[red]Error: previous output not found: {previous_output}[/red]")
+            raise typer.Exit(1)
+    else:
+        previous_source = previous_output = None
 
     # Get LLM provider
     try:
-        provider = get_provider(model)
+        provider = get_provider(model, requests_per_minute=rpm, tokens_per_minute=tpm)
     except Exception as e:
         console.print(f"[red]Error initializing {model.value} provider: {e}[/red]")
         raise typer.Exit(1)
 
+    memory = None
+    if use_memory:
+        memory_path = Path(get_settings().translation_memory_path).expanduser()
+        memory = TranslationMemory(memory_path)
+
+    expansion = ExpansionRatios(Path(get_settings().expansion_ratios_path).expanduser())
+
     # Run translation
     console.print(f"[bold]Translating[/bold] {input_file.name}")
-    console.print(f"  Target: {target_language}")
+    console.print(f"  Target: {', '.join(outputs)}")
     console.print(f"  Model: {model.value} ({provider.model_id})")
-    console.print(f"  Mode: {'Batch (50% cost, 24h turnaround)' if batch else 'Real-time'}")
-    console.print(f"  Output: {output_file}")
+    console.print(f"  Mode: {batch_mode_label(deadline) if batch else 'Real-time'}")
+    if concurrency > 1:
+        console.print(f"  Concurrency: {concurrency}")
+    if not batch:
+        console.print(f"  Context: {context_mode.value}")
+    if previous_output is not None:
+        console.print(f"  Incremental: reusing {previous_output}")
+    for path in outputs.values():
+        console.print(f"  Output: {path}")
     console.print()
 
     try:
         if batch:
-            # Use batch translation engine
+            # Use batch translation engine; each target is its own batch job
             engine = BatchTranslationEngine(
                 llm_provider=provider,
                 parser=parser,
                 chunk_size=chunk_size,
+                memory=memory,
+                expansion=expansion,
+                concurrency=concurrency,
             )
             with create_progress() as progress:
-                stats = asyncio.run(
-                    engine.translate_file_batch(
-                        input_path=input_file,
-                        output_path=output_file,
+
+                async def run_batches() -> list[dict]:
+                    return await asyncio.gather(
+                        *(
+                            engine.translate_file_batch(
+                                input_path=input_file,
+                                output_path=path,
+                                target_language=language,
+                                source_language=source_language,
+                                poll_interval=poll_interval,
+                                progress=progress,
+                                verbose=verbose,
+                                previous_source=previous_source,
+                                previous_output=previous_output,
+                                partial_output=(
+                                    path.with_name(f"{path.stem}.partial{path.suffix}")
+                                    if partial
+                                    else None
+                                ),
+                                deadline=deadline,
+                            )
+                            for language, path in outputs.items()
+                        )
+                    )
+
+                results = dict(zip(outputs, asyncio.run(run_batches())))
+            title = "Batch translation complete"
+        else:
+            # Use real-time translation engine
+            engine = TranslationEngine(
+                llm_provider=provider,
+                parser=parser,
+                chunk_size=chunk_size,
+                concurrency=concurrency,
+                context_mode=context_mode,
+                memory=memory,
+                context_window=context_window,
+                expansion=expansion,
+            )
+            with create_progress() as progress:
+                if len(outputs) > 1:
+                    # Parse and chunk once, then fan out to every target
+                    results = asyncio.run(
+                        engine.translate_file_multi(
+                            input_path=input_file,
+                            outputs=outputs,
+                            source_language=source_language,
+                            progress=progress,
+                            verbose=verbose,
+                        )
+                    )
+                else:
+                    results = {
+                        target_language: asyncio.run(
+                            engine.translate_file(
+                                input_path=input_file,
+                                output_path=output_file,
+                                target_language=target_language,
+                                source_language=source_language,
+                                progress=progress,
+                                verbose=verbose,
+                                previous_source=previous_source,
+                                previous_output=previous_output,
+                            )
+                        )
+                    }
+            title = "Translation complete"
+
+        for language, stats in results.items():
+            console.print()
+            title_line = f"{title} ({language})" if len(results) > 1 else title
+            if stats.get("resumed"):
+                title_line += " (resumed from checkpoint)"
+            console.print(f"[green]{title_line}![/green]")
+            print_translation_stats(stats, outputs[language])
+
+    except Exception as e:
+        console.print(f"[red]Translation failed: {e}[/red]")
+        if verbose:
+            console.print_exception()
+        raise typer.Exit(1)
+    finally:
+        if memory is not None:
+            memory.close()
+
+
+@app.command("translate-dir")
+def translate_dir(
+    input_dir: Path = typer.Argument(
+        ...,
+        help="Directory of files to translate (.txt, .docx, .md)",
+        exists=True,
+        file_okay=False,
+        readable=True,
+    ),
+    target_language: str = typer.Argument(
+        ...,
+        help="Target language (e.g., 'Spanish', 'French', 'Japanese')",
+    ),
+    output_dir: Path = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Directory mirroring input_dir for the translations (default: input_dir_<lang>)",
+    ),
+    pattern: str = typer.Option(
+        "**/*",
+        "--glob",
+        "-g",
+        help="Glob selecting files under input_dir; only supported file types are used",
+    ),
+    model: ModelProvider = typer.Option(
+        ModelProvider.OPENAI,
+        "--model",
+        "-m",
+        help="LLM provider to use",
+    ),
+    source_language: str = typer.Option(
+        None,
+        "--source",
+        "-s",
+        help="Source language (auto-detect if not specified)",
+    ),
+    chunk_size: int = typer.Option(
+        4000,
+        "--chunk-size",
+        "-c",
+        help="Maximum tokens per chunk (lowered if needed to fit the output budget)",
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose output",
+    ),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        "-b",
+        help="Use batch API, packing chunks of all files into shared batch jobs",
+    ),
+    poll_interval: int = typer.Option(
+        60,
+        "--poll-interval",
+        help="Longest wait in seconds between batch status checks (batch mode only)",
+    ),
+    deadline_value: str = typer.Option(
+        None,
+        "--deadline",
+        help="Finish by this time (HH:MM or ISO 8601): batch mode, moving chunks to "
+        "real time as the deadline nears",
+    ),
+    concurrency: int = typer.Option(
+        4,
+        "--concurrency",
+        "-j",
+        min=1,
+        help="Number of chunks translated in parallel, across all files",
+    ),
+    context_mode: ContextMode = typer.Option(
+        ContextMode.TRANSLATED,
+        "--context",
+        help=(
+            "Cross-chunk context: previous translation (sequential), "
+            "previous source text (parallel-safe) or none"
+        ),
+    ),
+    context_window: int = typer.Option(
+        2,
+        "--context-window",
+        min=1,
+        help="Number of preceding chunks context is drawn from",
+    ),
+    rpm: int = typer.Option(
+        None,
+        "--rpm",
+        min=1,
+        help="Requests-per-minute budget (learned from provider headers if not set)",
+    ),
+    tpm: int = typer.Option(
+        None,
+        "--tpm",
+        min=1,
+        help="Tokens-per-minute budget (learned from provider headers if not set)",
+    ),
+    use_memory: bool = typer.Option(
+        True,
+        "--memory/--no-memory",
+        help="Reuse and store translations in the local translation memory",
+    ),
+):
+    """Translate every supported file in a directory tree, mirroring its structure."""
+    deadline = None
+    if deadline_value is not None:
+        try:
+            deadline = parse_deadline(deadline_value)
+        except ValueError:
+            console.print(f"[red]Error: invalid --deadline: {deadline_value}[/red]")
+            raise typer.Exit(1)
+        batch = True
+
+    if output_dir is None:
+        input_dir = input_dir.resolve()
+        output_dir = input_dir.with_name(f"{input_dir.name}_{language_slug(target_language)}")
+
+    files = collect_files(input_dir, pattern, exclude=output_dir)
+    if not files:
+        console.print(f"[yellow]No supported files matching '{pattern}' in {input_dir}[/yellow]")
+        raise typer.Exit(1)
+
+    # Get LLM provider
+    try:
+        provider = get_provider(model, requests_per_minute=rpm, tokens_per_minute=tpm)
+    except Exception as e:
+        console.print(f"[red]Error initializing {model.value} provider: {e}[/red]")
+        raise typer.Exit(1)
+
+    memory = None
+    if use_memory:
+        memory_path = Path(get_settings().translation_memory_path).expanduser()
+        memory = TranslationMemory(memory_path)
+
+    expansion = ExpansionRatios(Path(get_settings().expansion_ratios_path).expanduser())
+
+    console.print(f"[bold]Translating[/bold] {len(files)} files in {input_dir}")
+    console.print(f"  Target: {target_language}")
+    console.print(f"  Model: {model.value} ({provider.model_id})")
+    console.print(f"  Mode: {batch_mode_label(deadline) if batch else 'Real-time'}")
+    console.print(f"  Concurrency: {concurrency}")
+    if not batch:
+        console.print(f"  Context: {context_mode.value}")
+    console.print(f"  Output: {output_dir}")
+    console.print()
+
+    jobs = []
+    for input_file in files:
+        output_file = output_dir / input_file.relative_to(input_dir)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        jobs.append((input_file, output_file, get_parser(input_file)))
+
+    try:
+        if batch:
+            # Chunks of all files share as few batch jobs as the provider allows
+            engine = BatchTranslationEngine(
+                llm_provider=provider,
+                # Each file is read with its own parser; this is only the default
+                parser=jobs[0][2],
+                chunk_size=chunk_size,
+                memory=memory,
+                expansion=expansion,
+                concurrency=concurrency,
+            )
+            with create_progress() as progress:
+                results = asyncio.run(
+                    engine.translate_files_batch(
+                        jobs,
                         target_language=target_language,
+                        checkpoint_path=output_dir / ".translate-dir-batch",
                         source_language=source_language,
                         poll_interval=poll_interval,
                         progress=progress,
                         verbose=verbose,
+                        deadline=deadline,
                     )
                 )
-
-            console.print()
-            if stats.get("resumed"):
-                console.print("[green]Batch translation complete (resumed from checkpoint)![/green]")
-            else:
-                console.print("[green]Batch translation complete![/green]")
-            console.print(f"  Input: {stats['input_chars']:,} characters")
-            console.print(f"  Output: {stats['output_chars']:,} characters")
-            console.print(f"  Chunks processed: {stats['chunks']}")
-            if stats.get("batch_id"):
-                console.print(f"  Batch ID: {stats['batch_id']}")
-            console.print(f"  Output file: {output_file}")
+            title = "Batch translation complete"
         else:
-            # Use real-time translation engine
             engine = TranslationEngine(
                 llm_provider=provider,
-                parser=parser,
+                # Each file is read with its own parser; this is only the default
+                parser=jobs[0][2],
                 chunk_size=chunk_size,
+                concurrency=concurrency,
+                context_mode=context_mode,
+                memory=memory,
+                context_window=context_window,
+                expansion=expansion,
             )
             with create_progress() as progress:
-                stats = asyncio.run(
-                    engine.translate_file(
-                        input_path=input_file,
-                        output_path=output_file,
+                results = asyncio.run(
+                    engine.translate_files(
+                        jobs,
                         target_language=target_language,
                         source_language=source_language,
                         progress=progress,
                         verbose=verbose,
                     )
                 )
+            title = "Translation complete"
 
-            console.print()
-            if stats.get("resumed"):
-                console.print("[green]Translation complete (resumed from checkpoint)![/green]")
-            else:
-                console.print("[green]Translation complete![/green]")
-            console.print(f"  Input: {stats['input_chars']:,} characters")
-            console.print(f"  Output: {stats['output_chars']:,} characters")
-            console.print(f"  Chunks processed: {stats['chunks']}")
-            console.print(f"  Output file: {output_file}")
+        console.print()
+        console.print(f"[green]{title}![/green]")
+        console.print(f"  Files: {len(results)}")
+        console.print(
+            f"  Input: {sum(s['input_chars'] for s in results.values()):,} characters"
+        )
+        console.print(
+            f"  Output: {sum(s['output_chars'] for s in results.values()):,} characters"
+        )
+        console.print(f"  Chunks processed: {sum(s['chunks'] for s in results.values())}")
+        cached_chunks = sum(s["cached_chunks"] for s in results.values())
+        if cached_chunks:
+            console.print(f"  Chunks from memory: {cached_chunks}")
+        batch_ids = set().union(*(s.get("batch_ids", []) for s in results.values()))
+        if batch_ids:
+            console.print(f"  Batch jobs: {len(batch_ids)}")
+        resumed = sum(1 for s in results.values() if s.get("resumed"))
+        if resumed:
+            console.print(f"  Files resumed from checkpoint: {resumed}")
+        console.print(f"  Output directory: {output_dir}")
 
     except Exception as e:
         console.print(f"[red]Translation failed: {e}[/red]")
         if verbose:
             console.print_exception()
         raise typer.Exit(1)
+    finally:
+        if memory is not None:
+            memory.close()
 
 
 @app.command("validate")
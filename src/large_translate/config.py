@@ -21,6 +21,15 @@ class Settings(BaseSettings):
     default_chunk_size: int = 4000  # tokens
     default_context_length: int = 200  # characters
 
+    # Translation memory database (reused across runs)
+    translation_memory_path: str = "~/.cache/large-translate/memory.db"
+
+    # Calibrated token-count estimates for providers without a local tokenizer
+    token_estimator_path: str = "~/.cache/large-translate/tokenizer.json"
+
+    # Learned per-language translation expansion ratios
+    expansion_ratios_path: str = "~/.cache/large-translate/expansion.json"
+
 
 def get_settings() -> Settings:
     """Get application settings."""
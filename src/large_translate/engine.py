@@ -1,10 +1,17 @@
 """Translation engine - orchestrates the translation process."""
 
 import asyncio
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from rich.progress import Progress, TaskID
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 from .checkpoint import (
     CheckpointData,
@@ -12,9 +19,75 @@ from .checkpoint import (
     deserialize_segment,
     serialize_segment,
 )
-from .chunking import Chunk, ChunkingStrategy, ContextManager
-from .models.base import BaseLLMProvider
-from .parsers.base import BaseParser, TextSegment
+from .alignment import MissingSegmentsError, translate_aligned
+from .chunking import (
+    Chunk,
+    ChunkingStrategy,
+    ContextManager,
+    ContextMode,
+    reassemble_chunk,
+)
+from .expansion import ExpansionRatios
+from .incremental import reuse_previous_translation
+from .models.base import BaseLLMProvider, TranslationTruncatedError
+from .parsers.base import BaseParser, SegmentWriter, TextSegment
+from .pipeline import ReorderBuffer, run_bounded, translate_resplitting
+from .translation_memory import TranslationMemory
+
+
+@dataclass
+class _TargetRun:
+    """State of translating one input file into one target language."""
+
+    target_language: str
+    output_path: Path
+    checkpoint_mgr: CheckpointManager
+    context_manager: ContextManager
+    # Chunks completed by an interrupted run, and their translated segments
+    start_chunk: int = 0
+    restored_segments: list[TextSegment] = field(default_factory=list)
+    resumed: bool = False
+    task_id: TaskID | None = None
+    writer: SegmentWriter | None = None
+    reorder: ReorderBuffer[tuple[Chunk, list[TextSegment]]] = field(
+        default_factory=ReorderBuffer
+    )
+    # Known once the input has been fully chunked
+    total_chunks: int | None = None
+    # Output written and checkpoint cleaned up
+    done: bool = False
+    stats: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(
+            ("input_chars", "output_chars", "cached_chunks", "resplit_chunks", "segments"),
+            0,
+        )
+    )
+
+    def result(self) -> dict:
+        """Translation statistics of the completed run."""
+        result = {
+            "input_chars": self.stats["input_chars"],
+            "output_chars": self.stats["output_chars"],
+            "chunks": self.total_chunks or 0,
+            "segments": self.stats["segments"],
+            "cached_chunks": self.stats["cached_chunks"],
+            "resplit_chunks": self.stats["resplit_chunks"],
+        }
+        if self.resumed:
+            result["resumed"] = True
+        return result
+
+
+@dataclass
+class _FileJob:
+    """An input file and the output path for each of its target languages."""
+
+    input_path: Path
+    parser: BaseParser
+    segments: Iterable[TextSegment]
+    outputs: dict[str, Path]
+    # Set up when the job is planned
+    runs: list[_TargetRun] = field(default_factory=list)
 
 
 class TranslationEngine:
@@ -25,11 +98,37 @@ class TranslationEngine:
         llm_provider: BaseLLMProvider,
         parser: BaseParser,
         chunk_size: int = 4000,
+        concurrency: int = 1,
+        context_mode: ContextMode = ContextMode.TRANSLATED,
+        memory: TranslationMemory | None = None,
+        context_window: int = 2,
+        expansion: ExpansionRatios | None = None,
     ):
+        """
+        Initialize the translation engine.
+
+        Args:
+            llm_provider: The LLM provider to use for translation.
+            parser: The file parser to use.
+            chunk_size: Maximum tokens per chunk.
+            concurrency: Maximum number of chunk requests in flight. With more
+                than one, each chunk's context comes from the translations that
+                have completed in order at the time it is dispatched.
+            context_mode: Where cross-chunk context is taken from. SOURCE keeps
+                context exact regardless of concurrency.
+            memory: Translation memory consulted before, and updated after,
+                every API call.
+            context_window: Number of preceding chunks context is drawn from.
+            expansion: Per-language expansion ratios used to keep chunks within
+                the model's output budget; updated from translated chunks.
+        """
         self.llm = llm_provider
         self.parser = parser
         self.chunker = ChunkingStrategy(max_tokens=chunk_size)
-        self.context_manager = ContextManager()
+        self.context_manager = ContextManager(mode=context_mode, window=context_window)
+        self.concurrency = max(1, concurrency)
+        self.memory = memory
+        self.expansion = expansion or ExpansionRatios()
 
     async def translate_file(
         self,
@@ -39,135 +138,491 @@ class TranslationEngine:
         source_language: str | None = None,
         progress: Progress | None = None,
         verbose: bool = False,
+        previous_source: Path | None = None,
+        previous_output: Path | None = None,
     ) -> dict:
         """
         Translate a file end-to-end.
 
+        If previous_source and previous_output are given, segments unchanged
+        since previous_source keep their translation from previous_output and
+        only the changed segments are sent to the LLM.
+
         Returns:
             Dictionary with translation statistics including 'resumed' if resuming from checkpoint.
         """
-        # Initialize checkpoint manager
-        checkpoint_mgr = CheckpointManager(output_path)
+        # Parse input file lazily; chunking and translation consume it as they go
+        segments: Iterable[TextSegment] = self.parser.iter_segments(input_path)
+
+        # Reuse the previous translation for unchanged segments
+        reused_segments = 0
+        if previous_source is not None and previous_output is not None:
+            segments = list(segments)
+            if verbose and progress:
+                progress.console.print(f"Parsed {len(segments)} segments from input file")
+            segments, reused_segments = reuse_previous_translation(
+                segments,
+                self.parser.parse(previous_source),
+                self.parser.parse(previous_output),
+            )
+            if verbose and progress:
+                progress.console.print(
+                    f"Reusing {reused_segments}/{len(segments)} segments from previous translation"
+                )
 
-        # Parse input file
-        segments = self.parser.parse(input_path)
+        job = _FileJob(input_path, self.parser, segments, {target_language: output_path})
+        await self._run_jobs([job], source_language, progress, verbose)
+        result = job.runs[0].result()
+        result["reused_segments"] = reused_segments
+        return result
 
-        if verbose and progress:
-            progress.console.print(f"Parsed {len(segments)} segments from input file")
+    async def translate_file_multi(
+        self,
+        input_path: Path,
+        outputs: dict[str, Path],
+        source_language: str | None = None,
+        progress: Progress | None = None,
+        verbose: bool = False,
+    ) -> dict[str, dict]:
+        """
+        Translate a file into several target languages in one run.
 
-        # Create chunks
-        chunks = self.chunker.chunk_segments(segments, self.llm.count_tokens)
+        The file is parsed, chunked and token-counted once; every chunk is then
+        translated into each language, with all requests sharing the engine's
+        concurrency limit and the provider's rate limiter. Each language is
+        written to, and checkpointed alongside, its own output file.
 
-        if verbose and progress:
-            progress.console.print(f"Created {len(chunks)} chunks for translation")
+        Args:
+            input_path: Path to the input file.
+            outputs: Output path for each target language.
+            source_language: Source language (auto-detect if None).
+            progress: Optional Rich progress instance (one task per language).
+            verbose: Enable verbose output.
+
+        Returns:
+            Translation statistics for each target language.
+        """
+        job = _FileJob(
+            input_path, self.parser, self.parser.iter_segments(input_path), outputs
+        )
+        await self._run_jobs([job], source_language, progress, verbose)
+        results = {}
+        for run in job.runs:
+            results[run.target_language] = run.result()
+            results[run.target_language]["reused_segments"] = 0
+        return results
+
+    async def translate_files(
+        self,
+        files: list[tuple[Path, Path, BaseParser]],
+        target_language: str,
+        source_language: str | None = None,
+        progress: Progress | None = None,
+        verbose: bool = False,
+    ) -> dict[Path, dict]:
+        """
+        Translate many files through one shared work queue.
+
+        Chunks of all files are fed, in file order, into a single pool of
+        `concurrency` requests, so the next file's chunks start as soon as
+        slots free up instead of each file waiting for the previous one to
+        drain. Files are only opened when their first chunk is dispatched, and
+        each output is completed as soon as its last chunk is committed.
+
+        Args:
+            files: (input path, output path, parser) for each file.
+            target_language: Target language for translation.
+            source_language: Source language (auto-detect if None).
+            progress: Optional Rich progress instance; an overall task counts
+                completed files and each file in progress gets its own task.
+            verbose: Enable verbose output.
+
+        Returns:
+            Translation statistics for each input path.
+        """
+        files_task: TaskID | None = None
+        if progress:
+            files_task = progress.add_task("Files", total=len(files))
+
+        def on_done(run: _TargetRun) -> None:
+            if progress and files_task is not None:
+                progress.advance(files_task)
+
+        jobs = [
+            _FileJob(
+                input_path,
+                parser,
+                parser.iter_segments(input_path),
+                {target_language: output_path},
+            )
+            for input_path, output_path, parser in files
+        ]
+        await self._run_jobs(
+            jobs, source_language, progress, verbose, per_file=True, on_done=on_done
+        )
+
+        results = {}
+        for job in jobs:
+            results[job.input_path] = job.runs[0].result()
+            results[job.input_path]["reused_segments"] = 0
+        return results
+
+    async def _run_jobs(
+        self,
+        jobs: list[_FileJob],
+        source_language: str | None,
+        progress: Progress | None,
+        verbose: bool,
+        per_file: bool = False,
+        on_done: Callable[[_TargetRun], None] | None = None,
+    ) -> None:
+        """
+        Translate every chunk of every job into each of its targets.
+
+        Args:
+            jobs: Files to translate, planned lazily in order.
+            source_language: Source language (auto-detect if None).
+            progress: Optional Rich progress instance.
+            verbose: Enable verbose output.
+            per_file: Label progress tasks with the file name and remove
+                each one once its output is complete.
+            on_done: Called with each target run once its output is complete.
+        """
+        started: list[_FileJob] = []
+
+        def work() -> Iterator[tuple[_TargetRun, Chunk]]:
+            for job in jobs:
+                started.append(job)
+                yield from self._plan(job, source_language, progress, verbose, per_file)
+                for run in job.runs:
+                    finish_if_complete(run)
+
+        def finish_if_complete(run: _TargetRun) -> None:
+            if run.done or run.total_chunks is None:
+                return
+            if run.reorder.next_index < run.total_chunks:
+                return
+            run.writer.close()
+            # Clean up checkpoint on success
+            run.checkpoint_mgr.clean()
+            run.done = True
+            if progress and run.task_id is not None and per_file:
+                progress.remove_task(run.task_id)
+            if on_done is not None:
+                on_done(run)
+
+        def commit(
+            run: _TargetRun, chunk: Chunk, translated_chunk: list[TextSegment]
+        ) -> None:
+            run.writer.write_segments(translated_chunk)
+
+            # Store for context
+            translated_text = "\n\n".join(
+                seg.text
+                for seg, original in zip(translated_chunk, chunk.segments)
+                if not original.skip_translation
+            )
+            context_entry = run.context_manager.add_translation(translated_text)
+
+            # Track stats
+            for seg in chunk.segments:
+                run.stats["input_chars"] += len(seg.text)
+            for seg in translated_chunk:
+                run.stats["output_chars"] += len(seg.text)
+            run.stats["segments"] += len(translated_chunk)
+
+            # Journal each contiguous completed chunk
+            run.checkpoint_mgr.append(
+                chunk.chunk_index,
+                [serialize_segment(s) for s in translated_chunk],
+                context=context_entry,
+            )
+
+        async def translate(item: tuple[_TargetRun, Chunk]) -> None:
+            run, chunk = item
+            target_language = run.target_language
+            context = run.context_manager.get_context(chunk.chunk_index)
+            run.context_manager.add_source(self._source_text(chunk))
+
+            translated_chunk = self._recall(chunk, target_language, source_language)
+            if translated_chunk is not None:
+                run.stats["cached_chunks"] += 1
+            else:
+
+                async def translate_part(part: Chunk) -> list[TextSegment]:
+                    try:
+                        return await self._translate_chunk(
+                            chunk=part,
+                            target_language=target_language,
+                            source_language=source_language,
+                            context=context,
+                        )
+                    except MissingSegmentsError as e:
+                        if progress:
+                            progress.console.print(
+                                f"[yellow]Warning: chunk {part.chunk_index + 1} of "
+                                f"{run.output_path.name}: {e}; keeping the source text[/yellow]"
+                            )
+                        return reassemble_chunk(part, e.keep_source())
+
+                def on_split(part: Chunk) -> None:
+                    if part is not chunk:
+                        return
+                    run.stats["resplit_chunks"] += 1
+                    if verbose and progress:
+                        progress.console.print(
+                            f"Chunk {chunk.chunk_index + 1} of {run.output_path.name} "
+                            "was truncated; re-translating it in smaller parts"
+                        )
+
+                # A truncated translation is re-split rather than padded
+                translated_chunk = await translate_resplitting(
+                    chunk, translate_part, on_split
+                )
+                self._observe_expansion(chunk, translated_chunk, target_language)
+
+            for _, (done, ready) in run.reorder.add(
+                chunk.chunk_index, (chunk, translated_chunk)
+            ):
+                commit(run, done, ready)
 
-        # Check for existing checkpoint
-        checkpoint = checkpoint_mgr.load()
-        start_chunk = 0
-        translated_segments: list[TextSegment] = []
-        resumed = False
+            # Update progress
+            if progress and run.task_id is not None:
+                progress.advance(run.task_id)
+
+            finish_if_complete(run)
+
+        # Translate chunks as they are produced; each output is only completed
+        # once all of its chunks are committed
+        try:
+            await run_bounded(work(), translate, self.concurrency)
+        except BaseException:
+            for job in started:
+                for run in job.runs:
+                    if run.writer is not None and not run.done:
+                        run.writer.abort()
+            raise
+        finally:
+            self.expansion.save()
+            self.llm.save_token_rates()
+
+    def _plan(
+        self,
+        job: _FileJob,
+        source_language: str | None,
+        progress: Progress | None,
+        verbose: bool,
+        per_file: bool,
+    ) -> Iterator[tuple[_TargetRun, Chunk]]:
+        """
+        Set up a job's target runs, then chunk it once for all of them.
 
-        if checkpoint and checkpoint.engine_type == "real-time":
-            # Validate checkpoint matches current job
+        Yields:
+            (run, chunk) for every chunk each target still has to translate.
+            When the generator is exhausted, every run's total_chunks is set.
+        """
+        input_path = job.input_path
+        input_size = input_path.stat().st_size
+
+        # Cap chunk size so translations fit the model's output budget; one
+        # chunking serves every target, so the most expansive language decides
+        chunker = self.chunker
+        for target_language in job.outputs:
+            chunker = chunker.with_output_budget(
+                self.llm.max_output_tokens,
+                self.expansion.ratio(self.llm.model_id, target_language),
+            )
+
+        job.runs = [
+            _TargetRun(
+                target_language=target_language,
+                output_path=output_path,
+                checkpoint_mgr=CheckpointManager(
+                    output_path, context_window=self.context_manager.window
+                ),
+                context_manager=ContextManager(
+                    context_length=self.context_manager.context_length,
+                    mode=self.context_manager.mode,
+                    window=self.context_manager.window,
+                ),
+            )
+            for target_language, output_path in job.outputs.items()
+        ]
+        runs = job.runs
+
+        # Check for existing checkpoints; chunking is deterministic for the
+        # same input, chunk size and token rates
+        checkpoints: dict[str, CheckpointData] = {}
+        for run in runs:
+            checkpoint = run.checkpoint_mgr.load()
             if (
-                checkpoint.input_path == str(input_path)
-                and checkpoint.target_language == target_language
-                and checkpoint.total_chunks == len(chunks)
+                checkpoint
+                and checkpoint.engine_type == "real-time"
+                and checkpoint.input_path == str(input_path)
+                and checkpoint.target_language == run.target_language
+                and checkpoint.chunk_size <= self.chunker.max_tokens
+                and checkpoint.input_size == input_size
             ):
-                start_chunk = checkpoint.last_completed_chunk + 1
+                checkpoints[run.target_language] = checkpoint
+
+        token_rates = self.llm.token_rates
+        if checkpoints:
+            # Re-chunk exactly as the furthest interrupted run did; learned
+            # expansion ratios and token rates may have moved since. Targets
+            # checkpointed with a different chunk size start over.
+            furthest = max(checkpoints.values(), key=lambda c: c.last_completed_chunk)
+            chunker = ChunkingStrategy(max_tokens=furthest.chunk_size)
+            token_rates = furthest.token_rates or token_rates
+            for run in runs:
+                checkpoint = checkpoints.get(run.target_language)
+                if (
+                    checkpoint is None
+                    or checkpoint.chunk_size != chunker.max_tokens
+                    or (checkpoint.token_rates or token_rates) != token_rates
+                ):
+                    continue
+                run.start_chunk = checkpoint.last_completed_chunk + 1
                 # Restore translated segments
-                translated_segments = [
+                run.restored_segments = [
                     TextSegment(**deserialize_segment(s))
                     for s in checkpoint.translated_segments
                 ]
                 # Restore context history
-                self.context_manager.previous_translations = checkpoint.context_history
-                resumed = True
+                run.context_manager.restore(checkpoint.context_history)
+                run.resumed = True
 
                 if progress:
                     progress.console.print(
-                        f"[yellow]Resuming from checkpoint: {start_chunk}/{len(chunks)} chunks completed[/yellow]"
+                        f"[yellow]Resuming {run.output_path.name} from checkpoint: "
+                        f"{run.start_chunk} chunks completed[/yellow]"
                     )
 
-        # Set up progress tracking
-        task_id: TaskID | None = None
+        # Set up progress tracking; the total is estimated until chunking finishes
+        estimated_chunks = max(
+            [chunker.estimate_chunks(input_size)] + [run.start_chunk for run in runs]
+        )
         if progress:
-            task_id = progress.add_task(
-                f"Translating to {target_language}",
-                total=len(chunks),
-                completed=start_chunk,
-            )
-
-        # Calculate stats for already-translated chunks
-        total_input_chars = 0
-        total_output_chars = 0
-
-        for i, chunk in enumerate(chunks[:start_chunk]):
-            for seg in chunk.segments:
-                total_input_chars += len(seg.text)
-        for seg in translated_segments:
-            total_output_chars += len(seg.text)
-
-        # Translate remaining chunks
-        for chunk in chunks[start_chunk:]:
-            context = self.context_manager.get_context(chunk.chunk_index)
-
-            translated_chunk = await self._translate_chunk(
-                chunk=chunk,
-                target_language=target_language,
-                source_language=source_language,
-                context=context,
-            )
-
-            translated_segments.extend(translated_chunk)
+            for run in runs:
+                if per_file:
+                    description = f"{input_path.name} to {run.target_language}"
+                else:
+                    description = f"Translating to {run.target_language}"
+                run.task_id = progress.add_task(
+                    description,
+                    total=estimated_chunks,
+                    completed=run.start_chunk,
+                )
 
-            # Track stats
-            for seg in chunk.segments:
-                total_input_chars += len(seg.text)
-            for seg in translated_chunk:
-                total_output_chars += len(seg.text)
-
-            # Save checkpoint after each successful chunk
-            checkpoint_mgr.save(
-                CheckpointData(
-                    engine_type="real-time",
-                    input_path=str(input_path),
-                    output_path=str(output_path),
-                    target_language=target_language,
-                    source_language=source_language,
-                    chunk_size=self.chunker.max_tokens,
-                    last_completed_chunk=chunk.chunk_index,
-                    total_chunks=len(chunks),
-                    translated_segments=[
-                        serialize_segment(s) for s in translated_segments
-                    ],
-                    context_history=self.context_manager.previous_translations,
+        def set_total(total: int) -> None:
+            if progress:
+                for run in runs:
+                    if run.task_id is not None and not run.done:
+                        progress.update(run.task_id, total=total)
+
+        for run in runs:
+            run.reorder = ReorderBuffer(start=run.start_chunk)
+            run.stats["output_chars"] = sum(len(s.text) for s in run.restored_segments)
+            run.stats["segments"] = len(run.restored_segments)
+
+            if not run.resumed:
+                # Start a fresh checkpoint; completed chunks are journaled onto it
+                run.checkpoint_mgr.save(
+                    CheckpointData(
+                        engine_type="real-time",
+                        input_path=str(input_path),
+                        output_path=str(run.output_path),
+                        target_language=run.target_language,
+                        source_language=source_language,
+                        chunk_size=chunker.max_tokens,
+                        last_completed_chunk=-1,
+                        total_chunks=0,
+                        translated_segments=[],
+                        context_history=[],
+                        input_size=input_size,
+                        token_rates=token_rates,
+                    )
                 )
-            )
 
-            # Update progress
-            if progress and task_id is not None:
-                progress.advance(task_id)
+            # Output is written incrementally as chunks commit in order
+            run.writer = job.parser.open_writer(run.output_path, input_path)
+            run.writer.write_segments(run.restored_segments)
+            run.restored_segments = []
+
+        total_chunks = 0
+        count_tokens, count_tokens_many = self.llm.token_counters(token_rates)
+        for chunk in chunker.iter_chunks(job.segments, count_tokens, count_tokens_many):
+            # Count chunks as they are produced and keep the progress total honest
+            total_chunks += 1
+            if total_chunks > estimated_chunks:
+                estimated_chunks = total_chunks
+                set_total(estimated_chunks)
+
+            # Pair the chunk with every target still to translate it
+            for run in runs:
+                if chunk.chunk_index < run.start_chunk:
+                    # Completed before the checkpoint
+                    run.stats["input_chars"] += sum(len(s.text) for s in chunk.segments)
+                    run.context_manager.add_source(self._source_text(chunk))
+                else:
+                    yield run, chunk
+
+        set_total(total_chunks)
+        for run in runs:
+            run.total_chunks = total_chunks
+        if verbose and progress:
+            progress.console.print(
+                f"Created {total_chunks} chunks of up to {chunker.max_tokens} tokens "
+                f"from {input_path.name}"
+            )
 
-        # Write output
-        self.parser.write(translated_segments, output_path, input_path)
+    def _recall(
+        self,
+        chunk: Chunk,
+        target_language: str,
+        source_language: str | None,
+    ) -> list[TextSegment] | None:
+        """Get a chunk's translation from translation memory, if fully covered."""
+        texts = [s.text for s in chunk.segments if not s.skip_translation]
+        if self.memory is None or not texts:
+            return None
+
+        translated_parts = self.memory.recall(
+            texts, target_language, source_language, self.llm.model_id
+        )
+        if translated_parts is None:
+            return None
+        return reassemble_chunk(chunk, translated_parts)
 
-        # Clean up checkpoint on success
-        checkpoint_mgr.clean()
+    def _observe_expansion(
+        self,
+        chunk: Chunk,
+        translated_chunk: list[TextSegment],
+        target_language: str,
+    ) -> None:
+        """Learn the target language's expansion ratio from a translated chunk."""
+        translated_text = "\n\n".join(
+            seg.text
+            for seg, original in zip(translated_chunk, chunk.segments)
+            if not original.skip_translation
+        )
+        self.expansion.observe(
+            self.llm.model_id,
+            target_language,
+            chunk.token_count,
+            self.llm.count_tokens(translated_text),
+        )
 
-        result = {
-            "input_chars": total_input_chars,
-            "output_chars": total_output_chars,
-            "chunks": len(chunks),
-            "segments": len(translated_segments),
-        }
-        if resumed:
-            result["resumed"] = True
-        return result
+    @staticmethod
+    def _source_text(chunk: Chunk) -> str:
+        """Combined text of a chunk's translatable segments."""
+        return "\n\n".join(s.text for s in chunk.segments if not s.skip_translation)
 
     @retry(
         wait=wait_exponential_jitter(initial=1, max=60, jitter=5),
         stop=stop_after_attempt(5),
+        # Truncation is handled by re-splitting the chunk, and segments the
+        # model keeps dropping by keeping their source, not by retrying it
+        retry=retry_if_not_exception_type((TranslationTruncatedError, MissingSegmentsError)),
         reraise=True,
     )
     async def _translate_chunk(
@@ -178,51 +633,33 @@ class TranslationEngine:
         context: str | None,
     ) -> list[TextSegment]:
         """Translate a single chunk with retry logic."""
-        # Separate translatable and non-translatable segments
         translatable_segments = [s for s in chunk.segments if not s.skip_translation]
-        non_translatable = {
-            i: s for i, s in enumerate(chunk.segments) if s.skip_translation
-        }
 
         if not translatable_segments:
             # All segments are non-translatable
             return list(chunk.segments)
 
-        # Combine segment texts for translation
-        combined_text = "\n\n".join(s.text for s in translatable_segments)
+        async def translate(text: str) -> str:
+            return await self.llm.translate(
+                text=text,
+                target_language=target_language,
+                source_language=source_language,
+                context=context,
+            )
 
-        # Translate
-        translated_text = await self.llm.translate(
-            text=combined_text,
-            target_language=target_language,
-            source_language=source_language,
-            context=context,
+        # Translate with numbered segment markers; only segments whose
+        # markers do not line up are requested again
+        translated_parts = await translate_aligned(
+            [s.text for s in translatable_segments], translate
         )
 
-        # Store for context
-        self.context_manager.add_translation(translated_text)
-
-        # Split back into segments
-        translated_parts = translated_text.split("\n\n")
-
-        # Reconstruct result maintaining order
-        result = []
-        trans_idx = 0
-
-        for i, segment in enumerate(chunk.segments):
-            if i in non_translatable:
-                result.append(segment)
-            else:
-                translated_segment = TextSegment(
-                    text=(
-                        translated_parts[trans_idx]
-                        if trans_idx < len(translated_parts)
-                        else ""
-                    ),
-                    metadata=segment.metadata.copy(),
-                    segment_type=segment.segment_type,
-                )
-                result.append(translated_segment)
-                trans_idx += 1
+        if self.memory is not None:
+            self.memory.remember(
+                [s.text for s in translatable_segments],
+                translated_parts,
+                target_language,
+                source_language,
+                self.llm.model_id,
+            )
 
-        return result
+        return reassemble_chunk(chunk, translated_parts)
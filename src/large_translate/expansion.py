@@ -0,0 +1,95 @@
+"""Per-language expansion ratios for sizing chunks against the output budget."""
+
+from pathlib import Path
+
+from .json_cache import load_json_cache, save_json_cache
+
+# Output tokens per source token when translating (from English) into each
+# language, before any observations
+DEFAULT_EXPANSION_RATIOS = {
+    "spanish": 1.25,
+    "french": 1.3,
+    "german": 1.3,
+    "italian": 1.25,
+    "portuguese": 1.25,
+    "dutch": 1.3,
+    "russian": 1.4,
+    "polish": 1.4,
+    "turkish": 1.4,
+    "arabic": 1.4,
+    "hebrew": 1.4,
+    "hindi": 1.8,
+    "japanese": 1.3,
+    "korean": 1.4,
+    "chinese": 1.1,
+}
+
+# Ratio assumed for languages without a default or any observations
+FALLBACK_RATIO = 1.5
+
+
+class ExpansionRatios:
+    """
+    Tracks how much longer (in tokens) translations are than their source.
+
+    Ratios are kept per model and target language, seeded from
+    DEFAULT_EXPANSION_RATIOS and updated from completed chunks. With a cache
+    path, learned ratios persist across runs.
+    """
+
+    # Weight of a new observation in the running ratio
+    LEARNING_RATE = 0.1
+    # Chunks with fewer source tokens than this are too noisy to learn from
+    MIN_OBSERVED_TOKENS = 100
+    # Bounds on a learned ratio, guarding against outlier observations
+    MIN_RATIO = 0.3
+    MAX_RATIO = 4.0
+
+    def __init__(self, cache_path: Path | None = None):
+        """
+        Initialize the ratio table.
+
+        Args:
+            cache_path: JSON file to load and persist learned ratios (in
+                memory only if None).
+        """
+        self.cache_path = cache_path
+        self.learned: dict[str, dict[str, float]] = load_json_cache(cache_path)
+
+    @staticmethod
+    def _language_key(language: str) -> str:
+        return language.strip().lower()
+
+    def ratio(self, model_id: str, target_language: str) -> float:
+        """Expected output tokens per source token for a model and language."""
+        language = self._language_key(target_language)
+        learned = self.learned.get(model_id, {}).get(language)
+        if learned is not None:
+            return learned
+        return DEFAULT_EXPANSION_RATIOS.get(language, FALLBACK_RATIO)
+
+    def observe(
+        self,
+        model_id: str,
+        target_language: str,
+        source_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """Update the ratio for a language from one translated chunk."""
+        if source_tokens < self.MIN_OBSERVED_TOKENS or output_tokens <= 0:
+            return
+
+        observed = min(self.MAX_RATIO, max(self.MIN_RATIO, output_tokens / source_tokens))
+        current = self.ratio(model_id, target_language)
+        self.learned.setdefault(model_id, {})[self._language_key(target_language)] = (
+            current + self.LEARNING_RATE * (observed - current)
+        )
+
+    def save(self) -> None:
+        """Persist learned ratios, keeping entries written by other runs."""
+        if self.cache_path is None or not self.learned:
+            return
+        data = load_json_cache(self.cache_path)
+        for model_id, ratios in self.learned.items():
+            data.setdefault(model_id, {}).update(ratios)
+        save_json_cache(self.cache_path, data)
@@ -0,0 +1,63 @@
+"""Incremental re-translation: reuse an earlier translation for unchanged segments."""
+
+import difflib
+
+from .parsers.base import TextSegment
+
+
+def reuse_previous_translation(
+    segments: list[TextSegment],
+    previous_source: list[TextSegment],
+    previous_output: list[TextSegment],
+) -> tuple[list[TextSegment], int]:
+    """
+    Carry over translations of segments that did not change since the last run.
+
+    The new source segments are aligned against the previous source segments;
+    every segment inside an unchanged run takes the translation of its
+    counterpart in the previous output and is marked skip_translation, so the
+    engines pass it through without sending it to the LLM.
+
+    Args:
+        segments: Segments parsed from the new source file.
+        previous_source: Segments parsed from the previous source file.
+        previous_output: Segments parsed from the previous translation, one per
+            previous source segment.
+
+    Returns:
+        The updated segments and the number of segments that were reused.
+
+    Raises:
+        ValueError: If the previous source and output do not line up.
+    """
+    if len(previous_source) != len(previous_output):
+        raise ValueError(
+            f"Previous source has {len(previous_source)} segments but previous "
+            f"output has {len(previous_output)}; they cannot be aligned"
+        )
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        [s.text for s in previous_source],
+        [s.text for s in segments],
+        autojunk=False,
+    )
+
+    result = list(segments)
+    reused = 0
+    for tag, old_start, _old_end, new_start, new_end in matcher.get_opcodes():
+        if tag != "equal":
+            continue
+        for offset in range(new_end - new_start):
+            segment = segments[new_start + offset]
+            if segment.skip_translation:
+                continue
+            result[new_start + offset] = TextSegment(
+                text=previous_output[old_start + offset].text,
+                metadata={**segment.metadata, "reused": True},
+                segment_type=segment.segment_type,
+                skip_translation=True,
+            )
+            reused += 1
+
+    return result, reused
@@ -0,0 +1,50 @@
+"""JSON cache files for values learned across runs."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def load_json_cache(path: Path | None) -> dict[str, Any]:
+    """
+    Load a JSON cache file.
+
+    Returns:
+        The cached object, or an empty dict if there is no cache or it is
+        unreadable or malformed.
+    """
+    if path is None or not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json_cache(path: Path, data: dict[str, Any]) -> bool:
+    """
+    Write a JSON cache file atomically.
+
+    Returns:
+        Whether the file was written. Write errors are not raised: a cache is
+        an optimization, and a translation should never fail over it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        suffix=".json",
+        prefix=f".{path.stem}_",
+        dir=path.parent,
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        return False
+    return True
@@ -6,7 +6,10 @@ from .base import (
     BatchResult,
     BatchStatus,
     SentimentBatchRequest,
+    TranslationTruncatedError,
 )
+from .rate_limit import RateLimiter
+from .tokenizer import TokenEstimator
 from .openai import OpenAIProvider
 from .anthropic import AnthropicProvider
 from .google import GoogleProvider
@@ -17,6 +20,9 @@ __all__ = [
     "BatchResult",
     "BatchStatus",
     "SentimentBatchRequest",
+    "TranslationTruncatedError",
+    "RateLimiter",
+    "TokenEstimator",
     "OpenAIProvider",
     "AnthropicProvider",
     "GoogleProvider",
@@ -1,8 +1,20 @@
 """Anthropic Claude provider implementation."""
 
+import inspect
+from collections.abc import AsyncIterator, Callable
+
 from anthropic import AsyncAnthropic
 
-from .base import BaseLLMProvider, BatchRequest, BatchResult, BatchStatus, SentimentBatchRequest
+from .base import (
+    BaseLLMProvider,
+    BatchRequest,
+    BatchResult,
+    BatchStatus,
+    SentimentBatchRequest,
+    TranslationTruncatedError,
+)
+from .rate_limit import RateLimiter, RateLimitSlot
+from .tokenizer import TokenEstimator
 from ..prompts import TRANSLATION_SYSTEM_PROMPT, build_translation_prompt
 from ..sentiment_prompts import SENTIMENT_SYSTEM_PROMPT, build_sentiment_prompt
 
@@ -11,9 +23,19 @@ class AnthropicProvider(BaseLLMProvider):
     """Anthropic Claude Sonnet 4.5 provider."""
 
     MODEL_NAME = "claude-sonnet-4-5"
+    # Message Batches API limits per batch
+    MAX_BATCH_REQUESTS = 100_000
+    MAX_BATCH_BYTES = 256_000_000
 
-    def __init__(self):
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        token_estimator: TokenEstimator | None = None,
+    ):
         self.client = AsyncAnthropic()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # No local tokenizer is published for Claude models
+        self.token_estimator = token_estimator or TokenEstimator(self.MODEL_NAME)
 
     @property
     def name(self) -> str:
@@ -45,18 +67,61 @@ class AnthropicProvider(BaseLLMProvider):
             context=context,
         )
 
-        response = await self.client.messages.create(
-            model=self.MODEL_NAME,
-            max_tokens=self.max_output_tokens,
-            system=TRANSLATION_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
-        )
+        async with self._rate_limit(TRANSLATION_SYSTEM_PROMPT + user_prompt) as slot:
+            response = await self._create_message(
+                slot,
+                model=self.MODEL_NAME,
+                max_tokens=self.max_output_tokens,
+                system=TRANSLATION_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_prompt}],
+            )
 
-        return response.content[0].text if response.content else ""
+        translated_text = response.content[0].text if response.content else ""
+
+        # Calibrate token estimates against the reported usage
+        self.token_estimator.observe(
+            TRANSLATION_SYSTEM_PROMPT + user_prompt, response.usage.input_tokens
+        )
+        self.token_estimator.observe(translated_text, response.usage.output_tokens)
+
+        if response.stop_reason == "max_tokens":
+            raise TranslationTruncatedError(translated_text)
+        return translated_text
+
+    async def _create_message(self, slot: RateLimitSlot, **params):
+        """Create a message and record its usage and rate-limit headers on the slot."""
+        raw = await self.client.messages.with_raw_response.create(**params)
+        response = raw.parse()
+        if inspect.isawaitable(response):
+            # Newer SDK releases return an async raw response
+            response = await response
+        slot.record(
+            used_tokens=response.usage.input_tokens + response.usage.output_tokens,
+            headers=raw.headers,
+        )
+        return response
 
     def count_tokens(self, text: str) -> int:
-        # Rough estimate: ~4 characters per token
-        return len(text) // 4
+        return self.token_estimator.count(text)
+
+    def count_tokens_many(self, texts: list[str]) -> list[int]:
+        return self.token_estimator.count_many(texts)
+
+    @property
+    def token_rates(self) -> dict[str, float] | None:
+        return dict(self.token_estimator.rates)
+
+    def token_counters(
+        self,
+        rates: dict[str, float] | None = None,
+    ) -> tuple[Callable[[str], int], Callable[[list[str]], list[int]]]:
+        if rates is None:
+            return self.count_tokens, self.count_tokens_many
+        estimator = self.token_estimator.with_rates(rates)
+        return estimator.count, estimator.count_many
+
+    def save_token_rates(self) -> None:
+        self.token_estimator.save()
 
     # Batch inference methods
 
@@ -100,24 +165,31 @@ class AnthropicProvider(BaseLLMProvider):
         )
 
     async def get_batch_results(self, batch_id: str) -> list[BatchResult]:
-        results = []
-        async for result in self.client.messages.batches.results(batch_id):
+        return [result async for result in self.iter_batch_results(batch_id)]
+
+    async def iter_batch_results(self, batch_id: str) -> AsyncIterator[BatchResult]:
+        # Results are decoded from the JSONL stream as they arrive
+        async for result in await self.client.messages.batches.results(batch_id):
             translated_text = None
             error = None
-            if result.result and result.result.message:
+            truncated = False
+            if result.result and getattr(result.result, "message", None):
                 content = result.result.message.content
                 if content:
                     translated_text = content[0].text
-            if hasattr(result, "error") and result.error:
-                error = str(result.error)
-            results.append(
-                BatchResult(
-                    custom_id=result.custom_id,
-                    translated_text=translated_text,
-                    error=error,
-                )
+                truncated = result.result.message.stop_reason == "max_tokens"
+            if result.result and result.result.type != "succeeded":
+                # "errored", "canceled" or "expired"
+                error = str(getattr(result.result, "error", None) or result.result.type)
+            yield BatchResult(
+                custom_id=result.custom_id,
+                translated_text=translated_text,
+                error=error,
+                truncated=truncated,
             )
-        return results
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        await self.client.messages.batches.cancel(batch_id)
 
     # Sentiment analysis methods
 
@@ -131,12 +203,14 @@ class AnthropicProvider(BaseLLMProvider):
             labels=labels,
         )
 
-        response = await self.client.messages.create(
-            model=self.MODEL_NAME,
-            max_tokens=self.max_output_tokens,
-            system=SENTIMENT_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
-        )
+        async with self._rate_limit(SENTIMENT_SYSTEM_PROMPT + user_prompt) as slot:
+            response = await self._create_message(
+                slot,
+                model=self.MODEL_NAME,
+                max_tokens=self.max_output_tokens,
+                system=SENTIMENT_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_prompt}],
+            )
 
         return response.content[0].text if response.content else "{}"
 
@@ -1,8 +1,13 @@
 """Abstract base class for LLM providers."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass
 
+from ..prompts import TRANSLATION_SYSTEM_PROMPT, build_translation_prompt
+from .rate_limit import RateLimiter, RateLimitSlot
+
 
 @dataclass
 class BatchRequest:
@@ -18,10 +23,18 @@ class BatchRequest:
 class BatchStatus:
     """Status of a batch job."""
 
-    status: str  # "processing", "completed", "failed", "canceling"
+    status: str  # "processing", "completed", "failed", "expired", "cancelled"
     completed: int
     total: int
 
+    # Statuses of a batch that will make no further progress
+    FINISHED = ("completed", "failed", "expired", "cancelled")
+
+    @property
+    def finished(self) -> bool:
+        """Whether the batch has stopped; requests without a result will never get one."""
+        return self.status in self.FINISHED
+
 
 @dataclass
 class BatchResult:
@@ -30,6 +43,15 @@ class BatchResult:
     custom_id: str
     translated_text: str | None
     error: str | None = None
+    truncated: bool = False  # Output stopped at the max output token limit
+
+
+class TranslationTruncatedError(Exception):
+    """Raised when a translation stops at the max output token limit."""
+
+    def __init__(self, partial_text: str):
+        super().__init__("Translation was truncated at the max output token limit")
+        self.partial_text = partial_text
 
 
 @dataclass
@@ -44,6 +66,15 @@ class SentimentBatchRequest:
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Client-side pacing for real-time requests; providers set their own instance
+    rate_limiter: RateLimiter | None = None
+    # Most requests the provider accepts in one batch job
+    MAX_BATCH_REQUESTS = 50_000
+    # Largest batch job payload the provider accepts, in bytes
+    MAX_BATCH_BYTES = 100_000_000
+    # Bytes each batch request adds besides its prompts (IDs, model, settings)
+    BATCH_REQUEST_OVERHEAD = 512
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -87,6 +118,9 @@ class BaseLLMProvider(ABC):
 
         Returns:
             The translated text.
+
+        Raises:
+            TranslationTruncatedError: If the output hit max_output_tokens.
         """
         pass
 
@@ -95,8 +129,87 @@ class BaseLLMProvider(ABC):
         """Count tokens in text."""
         pass
 
+    def count_tokens_many(self, texts: list[str]) -> list[int]:
+        """
+        Count tokens in several texts at once.
+
+        Providers with a tokenizer that can encode in bulk override this; the
+        default counts each text in turn.
+
+        Args:
+            texts: Texts to count.
+
+        Returns:
+            One token count per text, in order.
+        """
+        return [self.count_tokens(text) for text in texts]
+
+    @property
+    def token_rates(self) -> dict[str, float] | None:
+        """
+        Per-script rates token counts are estimated from, or None if counted exactly.
+
+        The rates stay fixed for the run and are recorded in checkpoints, so an
+        interrupted translation is re-chunked exactly as before.
+        """
+        return None
+
+    def token_counters(
+        self,
+        rates: dict[str, float] | None = None,
+    ) -> tuple[Callable[[str], int], Callable[[list[str]], list[int]]]:
+        """
+        Get the functions chunks are sized with.
+
+        Args:
+            rates: Rates recorded by an earlier run (see `token_rates`); the
+                current ones if None. Ignored when tokens are counted exactly.
+
+        Returns:
+            Functions counting the tokens of one text and of several texts.
+        """
+        return self.count_tokens, self.count_tokens_many
+
+    def save_token_rates(self) -> None:
+        """Persist the token-count calibration learned during the run, if any."""
+
+    def _rate_limit(self, prompt: str) -> AbstractAsyncContextManager[RateLimitSlot]:
+        """
+        Reserve rate-limit budget for one real-time request.
+
+        The token estimate is the prompt's input tokens plus the full output
+        budget; the difference is refunded once the slot records actual usage.
+
+        Args:
+            prompt: The full prompt text (system and user) being sent.
+        """
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter()
+        return self.rate_limiter.limit(self.count_tokens(prompt) + self.max_output_tokens)
+
     # Batch inference methods
 
+    def batch_request_size(self, request: BatchRequest) -> int:
+        """
+        Estimate the bytes a request adds to a batch job's payload.
+
+        Used to split large submissions so each job stays under
+        MAX_BATCH_BYTES.
+
+        Args:
+            request: The batch request.
+        """
+        user_prompt = build_translation_prompt(
+            text=request.text,
+            target_language=request.target_language,
+            source_language=request.source_language,
+        )
+        return (
+            len(TRANSLATION_SYSTEM_PROMPT.encode("utf-8"))
+            + len(user_prompt.encode("utf-8"))
+            + self.BATCH_REQUEST_OVERHEAD
+        )
+
     @abstractmethod
     async def create_batch(self, requests: list[BatchRequest]) -> str:
         """
@@ -136,6 +249,35 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    async def iter_batch_results(self, batch_id: str) -> AsyncIterator[BatchResult]:
+        """
+        Stream the results of a completed batch job.
+
+        Providers that can download results incrementally override this, so
+        large batches are processed without holding every result in memory.
+        The default yields from `get_batch_results`.
+
+        Args:
+            batch_id: The batch job ID.
+
+        Yields:
+            The result of each request in the batch, in no particular order.
+        """
+        for result in await self.get_batch_results(batch_id):
+            yield result
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        """
+        Cancel a batch job whose remaining requests are no longer needed.
+
+        Results of requests completed before the cancellation stay available.
+        Providers without cancellation keep the default, which lets the batch
+        run to completion.
+
+        Args:
+            batch_id: The batch job ID.
+        """
+
     # Sentiment analysis methods
 
     @abstractmethod
@@ -1,11 +1,21 @@
 """Google Gemini provider implementation."""
 
+from collections.abc import Callable
 from datetime import datetime
 
 from google import genai
 from google.genai import types
 
-from .base import BaseLLMProvider, BatchRequest, BatchResult, BatchStatus, SentimentBatchRequest
+from .base import (
+    BaseLLMProvider,
+    BatchRequest,
+    BatchResult,
+    BatchStatus,
+    SentimentBatchRequest,
+    TranslationTruncatedError,
+)
+from .rate_limit import RateLimiter, RateLimitSlot
+from .tokenizer import TokenEstimator, load_gemini_tokenizer
 from ..prompts import TRANSLATION_SYSTEM_PROMPT, build_translation_prompt
 from ..sentiment_prompts import SENTIMENT_SYSTEM_PROMPT, build_sentiment_prompt
 
@@ -14,9 +24,20 @@ class GoogleProvider(BaseLLMProvider):
     """Google Gemini 3 Flash provider."""
 
     MODEL_NAME = "gemini-3-flash-preview"
+    # Inline batch requests share a ~20MB request size limit
+    MAX_BATCH_BYTES = 20_000_000
 
-    def __init__(self):
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        token_estimator: TokenEstimator | None = None,
+    ):
         self.client = genai.Client()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Fallback when the SDK's local tokenizer is not installed
+        self.token_estimator = token_estimator or TokenEstimator(self.MODEL_NAME)
+        self._local_tokenizer: Callable[[str], int] | None = None
+        self._local_tokenizer_loaded = False
 
     @property
     def name(self) -> str:
@@ -50,20 +71,86 @@ class GoogleProvider(BaseLLMProvider):
 
         full_prompt = f"{TRANSLATION_SYSTEM_PROMPT}\n\n{user_prompt}"
 
-        response = await self.client.aio.models.generate_content(
-            model=self.MODEL_NAME,
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                max_output_tokens=self.max_output_tokens,
-                temperature=0.3,
-            ),
+        async with self._rate_limit(full_prompt) as slot:
+            response = await self.client.aio.models.generate_content(
+                model=self.MODEL_NAME,
+                contents=full_prompt,
+                config=types.GenerateContentConfig(
+                    max_output_tokens=self.max_output_tokens,
+                    temperature=0.3,
+                ),
+            )
+            self._record_usage(slot, response)
+
+        translated_text = response.text or ""
+
+        # Calibrate token estimates against the reported usage
+        usage = getattr(response, "usage_metadata", None)
+        self.token_estimator.observe(full_prompt, getattr(usage, "prompt_token_count", None))
+        self.token_estimator.observe(
+            translated_text, getattr(usage, "candidates_token_count", None)
         )
 
-        return response.text or ""
+        if self._is_truncated(response):
+            raise TranslationTruncatedError(translated_text)
+        return translated_text
+
+    @staticmethod
+    def _is_truncated(response: types.GenerateContentResponse) -> bool:
+        """Check whether a response stopped at the max output token limit."""
+        candidates = getattr(response, "candidates", None) or []
+        return bool(candidates) and (
+            candidates[0].finish_reason == types.FinishReason.MAX_TOKENS
+        )
+
+    @staticmethod
+    def _record_usage(
+        slot: RateLimitSlot, response: types.GenerateContentResponse
+    ) -> None:
+        """Record a response's token usage and headers on a rate-limit slot."""
+        usage = getattr(response, "usage_metadata", None)
+        http_response = getattr(response, "sdk_http_response", None)
+        slot.record(
+            used_tokens=getattr(usage, "total_token_count", None),
+            headers=getattr(http_response, "headers", None),
+        )
 
     def count_tokens(self, text: str) -> int:
-        # Rough estimate: ~4 characters per token
-        return len(text) // 4
+        local_tokenizer = self._get_local_tokenizer()
+        if local_tokenizer is not None:
+            return local_tokenizer(text)
+        return self.token_estimator.count(text)
+
+    def count_tokens_many(self, texts: list[str]) -> list[int]:
+        local_tokenizer = self._get_local_tokenizer()
+        if local_tokenizer is not None:
+            return [local_tokenizer(text) for text in texts]
+        return self.token_estimator.count_many(texts)
+
+    @property
+    def token_rates(self) -> dict[str, float] | None:
+        if self._get_local_tokenizer() is not None:
+            return None
+        return dict(self.token_estimator.rates)
+
+    def token_counters(
+        self,
+        rates: dict[str, float] | None = None,
+    ) -> tuple[Callable[[str], int], Callable[[list[str]], list[int]]]:
+        if rates is None or self._get_local_tokenizer() is not None:
+            return self.count_tokens, self.count_tokens_many
+        estimator = self.token_estimator.with_rates(rates)
+        return estimator.count, estimator.count_many
+
+    def save_token_rates(self) -> None:
+        self.token_estimator.save()
+
+    def _get_local_tokenizer(self) -> Callable[[str], int] | None:
+        """Load the local Gemini tokenizer on first use (it may need a download)."""
+        if not self._local_tokenizer_loaded:
+            self._local_tokenizer = load_gemini_tokenizer(self.MODEL_NAME)
+            self._local_tokenizer_loaded = True
+        return self._local_tokenizer
 
     # Batch inference methods
 
@@ -105,10 +192,12 @@ class GoogleProvider(BaseLLMProvider):
         batch = await self.client.aio.batches.get(name=batch_id)
         # Map Google batch states to our status
         state = getattr(batch, "state", "")
-        if state in ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED"):
-            status = "completed"
-        else:
-            status = "processing"
+        status = {
+            "JOB_STATE_SUCCEEDED": "completed",
+            "JOB_STATE_FAILED": "failed",
+            "JOB_STATE_CANCELLED": "cancelled",
+            "JOB_STATE_EXPIRED": "expired",
+        }.get(state, "processing")
         return BatchStatus(
             status=status,
             completed=getattr(batch, "succeeded_count", 0),
@@ -122,8 +211,10 @@ class GoogleProvider(BaseLLMProvider):
         for resp in responses:
             translated_text = None
             error = None
+            truncated = False
             if hasattr(resp, "response") and resp.response:
                 translated_text = getattr(resp.response, "text", None)
+                truncated = self._is_truncated(resp.response)
             if hasattr(resp, "error") and resp.error:
                 error = str(resp.error)
             results.append(
@@ -131,10 +222,14 @@ class GoogleProvider(BaseLLMProvider):
                     custom_id=resp.key,
                     translated_text=translated_text,
                     error=error,
+                    truncated=truncated,
                 )
             )
         return results
 
+    async def cancel_batch(self, batch_id: str) -> None:
+        await self.client.aio.batches.cancel(name=batch_id)
+
     # Sentiment analysis methods
 
     async def analyze_sentiment(
@@ -150,15 +245,17 @@ class GoogleProvider(BaseLLMProvider):
         # Google doesn't support separate system role, so concatenate
         full_prompt = f"{SENTIMENT_SYSTEM_PROMPT}\n\n{user_prompt}"
 
-        response = await self.client.aio.models.generate_content(
-            model=self.MODEL_NAME,
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                max_output_tokens=self.max_output_tokens,
-                temperature=0.1,  # Lower temperature for classification
-                response_mime_type="application/json",
-            ),
-        )
+        async with self._rate_limit(full_prompt) as slot:
+            response = await self.client.aio.models.generate_content(
+                model=self.MODEL_NAME,
+                contents=full_prompt,
+                config=types.GenerateContentConfig(
+                    max_output_tokens=self.max_output_tokens,
+                    temperature=0.1,  # Lower temperature for classification
+                    response_mime_type="application/json",
+                ),
+            )
+            self._record_usage(slot, response)
 
         return response.text or "{}"
 
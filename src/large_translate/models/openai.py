@@ -1,12 +1,23 @@
 """OpenAI GPT provider implementation."""
 
-import io
+import functools
 import json
+import tempfile
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
 
 import tiktoken
 from openai import AsyncOpenAI
 
-from .base import BaseLLMProvider, BatchRequest, BatchResult, BatchStatus, SentimentBatchRequest
+from .base import (
+    BaseLLMProvider,
+    BatchRequest,
+    BatchResult,
+    BatchStatus,
+    SentimentBatchRequest,
+    TranslationTruncatedError,
+)
+from .rate_limit import RateLimiter
 from ..prompts import TRANSLATION_SYSTEM_PROMPT, build_translation_prompt
 from ..sentiment_prompts import SENTIMENT_SYSTEM_PROMPT, build_sentiment_prompt
 
@@ -15,14 +26,27 @@ class OpenAIProvider(BaseLLMProvider):
     """OpenAI GPT-5.2 provider."""
 
     MODEL_NAME = "gpt-5.2"
+    # Batch API input file size limit
+    MAX_BATCH_BYTES = 200_000_000
+    # Distinct strings whose token counts are memoized
+    TOKEN_COUNT_CACHE_SIZE = 4096
+    # Worker threads tiktoken uses for bulk encoding
+    TOKEN_COUNT_THREADS = 8
+    # Batch input files are kept in memory up to this size, then spooled to disk
+    BATCH_SPOOL_BYTES = 8 * 1024 * 1024
 
-    def __init__(self):
+    def __init__(self, rate_limiter: RateLimiter | None = None):
         self.client = AsyncOpenAI()
+        self.rate_limiter = rate_limiter or RateLimiter()
         # Use gpt-4o encoding as closest available
         try:
             self.encoder = tiktoken.encoding_for_model("gpt-4o")
         except KeyError:
             self.encoder = tiktoken.get_encoding("cl100k_base")
+        # Chunking and rate limiting count the same strings repeatedly
+        self._count_tokens = functools.lru_cache(maxsize=self.TOKEN_COUNT_CACHE_SIZE)(
+            self._encoded_length
+        )
 
     @property
     def name(self) -> str:
@@ -54,66 +78,100 @@ class OpenAIProvider(BaseLLMProvider):
             context=context,
         )
 
-        response = await self.client.chat.completions.create(
-            model=self.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_completion_tokens=self.max_output_tokens,
-            temperature=0.3,
-        )
+        async with self._rate_limit(TRANSLATION_SYSTEM_PROMPT + user_prompt) as slot:
+            raw = await self.client.chat.completions.with_raw_response.create(
+                model=self.MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                max_completion_tokens=self.max_output_tokens,
+                temperature=0.3,
+            )
+            response = raw.parse()
+            slot.record(
+                used_tokens=response.usage.total_tokens if response.usage else None,
+                headers=raw.headers,
+            )
 
-        return response.choices[0].message.content or ""
+        choice = response.choices[0]
+        translated_text = choice.message.content or ""
+        if choice.finish_reason == "length":
+            raise TranslationTruncatedError(translated_text)
+        return translated_text
 
     def count_tokens(self, text: str) -> int:
+        return self._count_tokens(text)
+
+    def _encoded_length(self, text: str) -> int:
         return len(self.encoder.encode(text))
 
+    def count_tokens_many(self, texts: list[str]) -> list[int]:
+        # tiktoken releases the GIL, so a thread pool encodes in parallel
+        encoded = self.encoder.encode_batch(texts, num_threads=self.TOKEN_COUNT_THREADS)
+        return [len(tokens) for tokens in encoded]
+
     # Batch inference methods
 
     async def create_batch(self, requests: list[BatchRequest]) -> str:
-        # Create JSONL content
-        lines = []
-        for req in requests:
-            user_prompt = build_translation_prompt(
-                text=req.text,
-                target_language=req.target_language,
-                source_language=req.source_language,
-            )
-            lines.append(
-                json.dumps(
-                    {
-                        "custom_id": req.custom_id,
-                        "method": "POST",
-                        "url": "/v1/chat/completions",
-                        "body": {
-                            "model": self.MODEL_NAME,
-                            "messages": [
-                                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
-                                {"role": "user", "content": user_prompt},
-                            ],
-                            "max_completion_tokens": self.max_output_tokens,
-                            "temperature": 0.3,
-                        },
-                    }
+        def lines() -> Iterable[dict[str, Any]]:
+            for req in requests:
+                user_prompt = build_translation_prompt(
+                    text=req.text,
+                    target_language=req.target_language,
+                    source_language=req.source_language,
                 )
-            )
+                yield {
+                    "custom_id": req.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.MODEL_NAME,
+                        "messages": [
+                            {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        "max_completion_tokens": self.max_output_tokens,
+                        "temperature": 0.3,
+                    },
+                }
 
         # Upload file
-        jsonl_content = "\n".join(lines)
-        file = await self.client.files.create(
-            file=io.BytesIO(jsonl_content.encode("utf-8")),
-            purpose="batch",
-        )
+        file_id = await self._upload_batch_file(lines())
 
         # Create batch job
         batch = await self.client.batches.create(
-            input_file_id=file.id,
+            input_file_id=file_id,
             endpoint="/v1/chat/completions",
             completion_window="24h",
         )
         return batch.id
 
+    async def _upload_batch_file(self, lines: Iterable[dict[str, Any]]) -> str:
+        """
+        Write batch requests as JSONL and upload them with the Files API.
+
+        Each line is serialized and written as it is produced, into a file
+        that moves to disk past BATCH_SPOOL_BYTES, and the upload streams
+        from that file. Memory use stays flat however large the batch is.
+
+        Args:
+            lines: One request object per JSONL line.
+
+        Returns:
+            The uploaded file's ID.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=self.BATCH_SPOOL_BYTES) as f:
+            for line in lines:
+                f.write(json.dumps(line).encode("utf-8"))
+                f.write(b"\n")
+            f.seek(0)
+            file = await self.client.files.create(
+                file=("batch.jsonl", f, "application/jsonl"),
+                purpose="batch",
+            )
+        return file.id
+
     async def get_batch_status(self, batch_id: str) -> BatchStatus:
         batch = await self.client.batches.retrieve(batch_id)
         return BatchStatus(
@@ -123,33 +181,43 @@ class OpenAIProvider(BaseLLMProvider):
         )
 
     async def get_batch_results(self, batch_id: str) -> list[BatchResult]:
+        return [result async for result in self.iter_batch_results(batch_id)]
+
+    async def iter_batch_results(self, batch_id: str) -> AsyncIterator[BatchResult]:
         batch = await self.client.batches.retrieve(batch_id)
         if not batch.output_file_id:
-            return []
-
-        content = await self.client.files.content(batch.output_file_id)
-        results = []
-        for line in content.text.split("\n"):
-            if line.strip():
-                data = json.loads(line)
-                translated_text = None
-                error = None
-                if data.get("response") and data["response"].get("body"):
-                    choices = data["response"]["body"].get("choices", [])
-                    if choices:
-                        translated_text = choices[0].get("message", {}).get(
-                            "content", ""
-                        )
-                if data.get("error"):
-                    error = str(data["error"])
-                results.append(
-                    BatchResult(
-                        custom_id=data["custom_id"],
-                        translated_text=translated_text,
-                        error=error,
-                    )
-                )
-        return results
+            return
+
+        # Read the output file line by line as it downloads
+        async with self.client.files.with_streaming_response.content(
+            batch.output_file_id
+        ) as response:
+            async for line in response.iter_lines():
+                if line.strip():
+                    yield self._parse_batch_result(json.loads(line))
+
+    async def cancel_batch(self, batch_id: str) -> None:
+        await self.client.batches.cancel(batch_id)
+
+    @staticmethod
+    def _parse_batch_result(data: dict[str, Any]) -> BatchResult:
+        """Convert one line of a batch output file to a BatchResult."""
+        translated_text = None
+        error = None
+        truncated = False
+        if data.get("response") and data["response"].get("body"):
+            choices = data["response"]["body"].get("choices", [])
+            if choices:
+                translated_text = choices[0].get("message", {}).get("content", "")
+                truncated = choices[0].get("finish_reason") == "length"
+        if data.get("error"):
+            error = str(data["error"])
+        return BatchResult(
+            custom_id=data["custom_id"],
+            translated_text=translated_text,
+            error=error,
+            truncated=truncated,
+        )
 
     # Sentiment analysis methods
 
@@ -163,16 +231,22 @@ class OpenAIProvider(BaseLLMProvider):
             labels=labels,
         )
 
-        response = await self.client.chat.completions.create(
-            model=self.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_completion_tokens=self.max_output_tokens,
-            temperature=0.1,  # Lower temperature for classification
-            response_format={"type": "json_object"},
-        )
+        async with self._rate_limit(SENTIMENT_SYSTEM_PROMPT + user_prompt) as slot:
+            raw = await self.client.chat.completions.with_raw_response.create(
+                model=self.MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                max_completion_tokens=self.max_output_tokens,
+                temperature=0.1,  # Lower temperature for classification
+                response_format={"type": "json_object"},
+            )
+            response = raw.parse()
+            slot.record(
+                used_tokens=response.usage.total_tokens if response.usage else None,
+                headers=raw.headers,
+            )
 
         return response.choices[0].message.content or "{}"
 
@@ -180,40 +254,32 @@ class OpenAIProvider(BaseLLMProvider):
         self,
         requests: list[SentimentBatchRequest],
     ) -> str:
-        lines = []
-        for req in requests:
-            user_prompt = build_sentiment_prompt(
-                sentences=req.sentences,
-                labels=req.labels,
-            )
-            lines.append(
-                json.dumps(
-                    {
-                        "custom_id": req.custom_id,
-                        "method": "POST",
-                        "url": "/v1/chat/completions",
-                        "body": {
-                            "model": self.MODEL_NAME,
-                            "messages": [
-                                {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
-                                {"role": "user", "content": user_prompt},
-                            ],
-                            "max_completion_tokens": self.max_output_tokens,
-                            "temperature": 0.1,
-                            "response_format": {"type": "json_object"},
-                        },
-                    }
+        def lines() -> Iterable[dict[str, Any]]:
+            for req in requests:
+                user_prompt = build_sentiment_prompt(
+                    sentences=req.sentences,
+                    labels=req.labels,
                 )
-            )
+                yield {
+                    "custom_id": req.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.MODEL_NAME,
+                        "messages": [
+                            {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        "max_completion_tokens": self.max_output_tokens,
+                        "temperature": 0.1,
+                        "response_format": {"type": "json_object"},
+                    },
+                }
 
-        jsonl_content = "\n".join(lines)
-        file = await self.client.files.create(
-            file=io.BytesIO(jsonl_content.encode("utf-8")),
-            purpose="batch",
-        )
+        file_id = await self._upload_batch_file(lines())
 
         batch = await self.client.batches.create(
-            input_file_id=file.id,
+            input_file_id=file_id,
             endpoint="/v1/chat/completions",
             completion_window="24h",
         )
@@ -0,0 +1,284 @@
+"""Client-side rate limiting shared by all providers."""
+
+import asyncio
+import re
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+# Header names carrying rate-limit state, per provider convention
+_LIMIT_HEADERS = {
+    "requests": (
+        "x-ratelimit-limit-requests",
+        "anthropic-ratelimit-requests-limit",
+    ),
+    "tokens": (
+        "x-ratelimit-limit-tokens",
+        "anthropic-ratelimit-tokens-limit",
+    ),
+}
+_REMAINING_HEADERS = {
+    "requests": (
+        "x-ratelimit-remaining-requests",
+        "anthropic-ratelimit-requests-remaining",
+    ),
+    "tokens": (
+        "x-ratelimit-remaining-tokens",
+        "anthropic-ratelimit-tokens-remaining",
+    ),
+}
+_RESET_HEADERS = {
+    "requests": (
+        "x-ratelimit-reset-requests",
+        "anthropic-ratelimit-requests-reset",
+    ),
+    "tokens": (
+        "x-ratelimit-reset-tokens",
+        "anthropic-ratelimit-tokens-reset",
+    ),
+}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def _parse_reset(value: str) -> float | None:
+    """
+    Parse a reset header into seconds from now.
+
+    Accepts plain seconds ("1.5"), Go-style durations ("6m0s", "20ms") and
+    RFC 3339 timestamps ("2025-01-01T00:00:00Z").
+    """
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _header(headers: Mapping[str, str], names: tuple[str, ...]) -> str | None:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+
+    per_minute: float
+    level: float = field(init=False)
+    updated: float = field(init=False, default_factory=time.monotonic)
+
+    def __post_init__(self):
+        self.level = self.per_minute
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in units per second."""
+        return self.per_minute / 60.0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float, scale: float = 1.0) -> float:
+        """
+        Take `amount` from the bucket, going into debt if necessary.
+
+        Returns:
+            Seconds the caller must wait before its reservation is covered.
+        """
+        self._refill(now)
+        self.level -= amount
+        if self.level >= 0:
+            return 0.0
+        return -self.level / (self.rate * scale)
+
+    def refund(self, amount: float, now: float) -> None:
+        """Return unused units to the bucket."""
+        self._refill(now)
+        self.level = min(self.per_minute, self.level + amount)
+
+    def drain(self, now: float) -> None:
+        """Empty the bucket so new callers wait for a refill."""
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+    def observe_remaining(self, remaining: float, reset_after: float | None, now: float) -> None:
+        """Clamp the local level to the server's view of remaining budget."""
+        self._refill(now)
+        if remaining <= 0 and reset_after:
+            # Exhausted: hold callers off until the server's window resets
+            self.level = min(self.level, -reset_after * self.rate)
+        else:
+            self.level = min(self.level, remaining)
+
+
+@dataclass
+class RateLimitSlot:
+    """A reserved slot for one request; report actual usage via `record`."""
+
+    reserved_tokens: int
+    used_tokens: int | None = None
+    headers: Mapping[str, str] | None = None
+
+    def record(
+        self,
+        used_tokens: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """Record actual token usage and response headers for this request."""
+        self.used_tokens = used_tokens
+        self.headers = headers
+
+
+class RateLimiter:
+    """
+    Paces requests to stay under requests-per-minute and tokens-per-minute budgets.
+
+    Budgets can be configured up front or learned from provider rate-limit
+    headers. Throttling responses (HTTP 429) pause all callers until the
+    provider's retry-after and temporarily slow the refill rate, which recovers
+    as requests succeed again.
+    """
+
+    # Fraction of the advertised limit to target, leaving room for clock skew
+    HEADROOM = 0.9
+    # Multiplicative slow-down applied on each throttling response
+    BACKOFF = 0.7
+    # Additive recovery applied after each successful request
+    RECOVERY = 0.05
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Request budget (learned from headers if None).
+            tokens_per_minute: Token budget (learned from headers if None).
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute * self.HEADROOM) if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute * self.HEADROOM) if tokens_per_minute else None
+        )
+        self._configured = {
+            "requests": requests_per_minute is not None,
+            "tokens": tokens_per_minute is not None,
+        }
+        self._scale = 1.0
+        self._blocked_until = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of `tokens` tokens fits in the budget."""
+        now = time.monotonic()
+        wait = max(0.0, self._blocked_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1, now, self._scale))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens, now, self._scale))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, reserved_tokens: int, used_tokens: int | None) -> None:
+        """Refund the difference between reserved and actually used tokens."""
+        self._scale = min(1.0, self._scale + self.RECOVERY)
+        if self.tokens is not None and used_tokens is not None:
+            unused = reserved_tokens - used_tokens
+            if unused > 0:
+                self.tokens.refund(unused, time.monotonic())
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Learn limits and remaining budget from rate-limit response headers."""
+        now = time.monotonic()
+        for kind in ("requests", "tokens"):
+            limit = _header(headers, _LIMIT_HEADERS[kind])
+            if limit is not None and not self._configured[kind]:
+                try:
+                    per_minute = float(limit) * self.HEADROOM
+                except ValueError:
+                    per_minute = 0
+                bucket = getattr(self, kind)
+                if per_minute > 0 and (bucket is None or bucket.per_minute != per_minute):
+                    setattr(self, kind, TokenBucket(per_minute))
+
+            bucket = getattr(self, kind)
+            remaining = _header(headers, _REMAINING_HEADERS[kind])
+            if bucket is None or remaining is None:
+                continue
+            reset = _header(headers, _RESET_HEADERS[kind])
+            try:
+                bucket.observe_remaining(
+                    float(remaining),
+                    _parse_reset(reset) if reset else None,
+                    now,
+                )
+            except ValueError:
+                continue
+
+    def record_throttle(self, retry_after: float | None = None) -> None:
+        """React to a throttling response by pausing and slowing down."""
+        now = time.monotonic()
+        self._scale = max(0.1, self._scale * self.BACKOFF)
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.drain(now)
+        pause = retry_after if retry_after is not None else 1.0
+        self._blocked_until = max(self._blocked_until, now + pause)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int) -> AsyncIterator[RateLimitSlot]:
+        """
+        Reserve budget for one request around the `async with` body.
+
+        The body should call `slot.record()` with the response's usage and
+        headers. Throttling errors raised from the body are recorded and
+        re-raised so the caller's retry policy still applies.
+        """
+        await self.acquire(tokens)
+        slot = RateLimitSlot(reserved_tokens=tokens)
+        try:
+            yield slot
+        except Exception as e:
+            if _is_throttle_error(e):
+                self.record_throttle(_retry_after(e))
+            raise
+        if slot.headers is not None:
+            self.update_from_headers(slot.headers)
+        self.settle(tokens, slot.used_tokens)
+
+
+def _is_throttle_error(error: Exception) -> bool:
+    """Check whether an SDK exception is an HTTP 429 response."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status == 429
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Extract a retry-after delay from an SDK exception's response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    return _parse_reset(value) if value else None
@@ -0,0 +1,173 @@
+"""Token counting for providers without a bundled tokenizer."""
+
+import re
+from collections.abc import Callable
+from pathlib import Path
+
+from ..json_cache import load_json_cache, save_json_cache
+
+# Character ranges of scripts whose tokens-per-character differ markedly from
+# Latin text; anything not matched here (Latin, digits, punctuation,
+# whitespace) is counted as "latin"
+_SCRIPT_PATTERNS = {
+    # Hiragana, Katakana, CJK ideographs and halfwidth Katakana
+    "cjk": re.compile(
+        "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f"
+        "\U00020000-\U0002fa1f]+"
+    ),
+    "hangul": re.compile("[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]+"),
+    "cyrillic": re.compile("[\u0400-\u052f]+"),
+    "greek": re.compile("[\u0370-\u03ff\u1f00-\u1fff]+"),
+    "arabic": re.compile("[\u0600-\u06ff\u0750-\u077f]+"),
+    "hebrew": re.compile("[\u0590-\u05ff]+"),
+    # Devanagari through Sinhala
+    "indic": re.compile("[\u0900-\u0dff]+"),
+    "thai": re.compile("[\u0e00-\u0e7f]+"),
+}
+
+# Starting tokens per character for each script, before any calibration
+DEFAULT_TOKENS_PER_CHAR = {
+    "latin": 0.25,
+    "cjk": 1.0,
+    "hangul": 0.8,
+    "cyrillic": 0.35,
+    "greek": 0.4,
+    "arabic": 0.4,
+    "hebrew": 0.45,
+    "indic": 0.6,
+    "thai": 0.5,
+}
+
+
+def script_counts(text: str) -> dict[str, int]:
+    """Count the characters of text per script."""
+    if text.isascii():
+        return {"latin": len(text)}
+
+    counts = {}
+    latin = len(text)
+    for script, pattern in _SCRIPT_PATTERNS.items():
+        count = sum(map(len, pattern.findall(text)))
+        if count:
+            counts[script] = count
+            latin -= count
+    counts["latin"] = latin
+    return counts
+
+
+class TokenEstimator:
+    """
+    Estimates token counts from per-script character counts.
+
+    Each script has its own tokens-per-character rate, seeded from
+    DEFAULT_TOKENS_PER_CHAR and calibrated from the token usage the provider
+    reports for real requests. Calibration only takes effect in later runs:
+    the rates counts are made with stay fixed for the run, so chunking is
+    deterministic. Calibrated rates are kept per model in a JSON cache file,
+    written by `save`.
+    """
+
+    # Weight of a new observation in the running per-script rate
+    LEARNING_RATE = 0.2
+    # Shorter observations are dominated by fixed per-request overhead
+    MIN_OBSERVED_CHARS = 200
+    # Bounds on a learned rate, guarding against outlier observations
+    MIN_RATE = 0.05
+    MAX_RATE = 4.0
+
+    def __init__(self, model_id: str, cache_path: Path | None = None):
+        """
+        Initialize the estimator.
+
+        Args:
+            model_id: Model whose tokenizer is being estimated.
+            cache_path: JSON file to load and persist calibrated rates (in
+                memory only if None).
+        """
+        self.model_id = model_id
+        self.cache_path = cache_path
+        self.rates = dict(DEFAULT_TOKENS_PER_CHAR)
+        self.rates.update(load_json_cache(cache_path).get(model_id, {}))
+        # Calibrated rates, saved for later runs
+        self.learned = dict(self.rates)
+        self._dirty = False
+
+    def with_rates(self, rates: dict[str, float]) -> "TokenEstimator":
+        """
+        Get an estimator counting with given rates, e.g. recorded in a checkpoint.
+
+        The copy does not calibrate this estimator or its cache.
+        """
+        estimator = TokenEstimator(self.model_id)
+        estimator.rates.update(rates)
+        estimator.learned = dict(estimator.rates)
+        return estimator
+
+    def count(self, text: str) -> int:
+        """Estimate the number of tokens in text."""
+        return round(
+            sum(n * self.rates[script] for script, n in script_counts(text).items())
+        )
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """Estimate the number of tokens in each of several texts."""
+        return [self.count(text) for text in texts]
+
+    def observe(self, text: str, tokens: int | None) -> None:
+        """
+        Calibrate against the actual token count the provider reported for text.
+
+        The observation is attributed to the script contributing most to the
+        estimate; its learned rate moves toward the value that would have made
+        the estimate exact. Counts in this run are unaffected.
+        """
+        if not tokens or len(text) < self.MIN_OBSERVED_CHARS:
+            return
+
+        counts = script_counts(text)
+        dominant = max(counts, key=lambda script: counts[script] * self.learned[script])
+        others = sum(
+            n * self.learned[script] for script, n in counts.items() if script != dominant
+        )
+        target = (tokens - others) / counts[dominant]
+        target = min(self.MAX_RATE, max(self.MIN_RATE, target))
+
+        rate = self.learned[dominant]
+        self.learned[dominant] = rate + self.LEARNING_RATE * (target - rate)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist this model's learned rates, keeping other models' entries."""
+        if self.cache_path is None or not self._dirty:
+            return
+        data = load_json_cache(self.cache_path)
+        data[self.model_id] = self.learned
+        if save_json_cache(self.cache_path, data):
+            self._dirty = False
+
+
+def load_gemini_tokenizer(model_id: str) -> Callable[[str], int] | None:
+    """
+    Load the google-genai local tokenizer for a Gemini model.
+
+    Requires the optional `local-tokenizer` extra of google-genai. The
+    tokenizer model is downloaded once and cached by the SDK.
+
+    Returns:
+        A token-counting function, or None if the local tokenizer is not
+        installed, does not support the model, or cannot be loaded.
+    """
+    try:
+        from google.genai.local_tokenizer import LocalTokenizer
+    except ImportError:
+        return None
+
+    try:
+        tokenizer = LocalTokenizer(model_name=model_id)
+    except Exception:
+        return None
+
+    def count(text: str) -> int:
+        return tokenizer.count_tokens(text).total_tokens or 0
+
+    return count
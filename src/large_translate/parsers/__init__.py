@@ -1,8 +1,15 @@
 """File parser implementations."""
 
-from .base import BaseParser, TextSegment
+from .base import BaseParser, SegmentWriter, TextSegment
 from .txt import TxtParser
 from .docx import DocxParser
 from .markdown import MarkdownParser
 
-__all__ = ["BaseParser", "TextSegment", "TxtParser", "DocxParser", "MarkdownParser"]
+__all__ = [
+    "BaseParser",
+    "SegmentWriter",
+    "TextSegment",
+    "TxtParser",
+    "DocxParser",
+    "MarkdownParser",
+]
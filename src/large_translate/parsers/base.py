@@ -1,9 +1,11 @@
 """Abstract base class for file parsers."""
 
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 
 @dataclass
@@ -16,6 +18,118 @@ class TextSegment:
     skip_translation: bool = False
 
 
+class SegmentWriter(ABC):
+    """
+    Incremental writer returned by `BaseParser.open_writer`.
+
+    Segments are handed over in document order with `write_segments`; the output
+    file is complete once `close` returns.
+    """
+
+    @abstractmethod
+    def write_segments(self, segments: Iterable[TextSegment]) -> None:
+        """Append segments to the output."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish writing the output file."""
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Discard the output without completing it."""
+        pass
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BufferedSegmentWriter(SegmentWriter):
+    """
+    Buffers all segments and delegates to the parser's `write` on close.
+
+    Used for formats that cannot be written incrementally.
+    """
+
+    def __init__(
+        self,
+        parser: "BaseParser",
+        output_path: Path,
+        template_path: Path | None = None,
+    ):
+        self.parser = parser
+        self.output_path = output_path
+        self.template_path = template_path
+        self._segments: list[TextSegment] = []
+
+    def write_segments(self, segments: Iterable[TextSegment]) -> None:
+        self._segments.extend(segments)
+
+    def close(self) -> None:
+        self.parser.write(self._segments, self.output_path, self.template_path)
+        self._segments = []
+
+    def abort(self) -> None:
+        self._segments = []
+
+
+class StreamingTextWriter(SegmentWriter):
+    """
+    Writes segments straight to disk, separated by blank lines.
+
+    Output goes to a `.part` file next to the target that is renamed into place
+    on close, so an interrupted run never leaves a truncated output behind.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        render: Callable[[TextSegment], str],
+        separator: str = "\n\n",
+    ):
+        self.output_path = output_path
+        self.render = render
+        self.separator = separator
+        self.part_path = output_path.with_name(f"{output_path.name}.part")
+        self._file: TextIO | None = open(self.part_path, "w", encoding="utf-8")
+        self._first = True
+
+    def write_segments(self, segments: Iterable[TextSegment]) -> None:
+        for segment in segments:
+            if not self._first:
+                self._file.write(self.separator)
+            self._file.write(self.render(segment))
+            self._first = False
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.replace(self.part_path, self.output_path)
+
+    def abort(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.part_path.unlink(missing_ok=True)
+
+
+def iter_lines(file_path: Path) -> Iterator[str]:
+    """Yield the lines of a UTF-8 text file without their line endings."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
 class BaseParser(ABC):
     """Abstract base class for file parsers."""
 
@@ -54,3 +168,36 @@ class BaseParser(ABC):
             template_path: Original file to use as template (for preserving formatting).
         """
         pass
+
+    def iter_segments(self, file_path: Path) -> Iterator[TextSegment]:
+        """
+        Parse file into segments lazily.
+
+        Parsers that can read their format incrementally override this so large
+        files are never held in memory at once; the default parses the whole
+        file.
+
+        Args:
+            file_path: Path to the input file.
+
+        Yields:
+            Text segments in document order.
+        """
+        yield from self.parse(file_path)
+
+    def open_writer(
+        self,
+        output_path: Path,
+        template_path: Path | None = None,
+    ) -> SegmentWriter:
+        """
+        Open an incremental writer for translated segments.
+
+        Args:
+            output_path: Path to write the output file.
+            template_path: Original file to use as template (for preserving formatting).
+
+        Returns:
+            A writer that accepts segments in document order.
+        """
+        return BufferedSegmentWriter(self, output_path, template_path)
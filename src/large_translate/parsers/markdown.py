@@ -1,16 +1,17 @@
 """Markdown file parser with structure preservation."""
 
 import re
+from collections.abc import Iterator
 from pathlib import Path
 
-from .base import BaseParser, TextSegment
+from .base import BaseParser, SegmentWriter, StreamingTextWriter, TextSegment, iter_lines
 
 
 class MarkdownParser(BaseParser):
     """Parser for Markdown files that preserves structure."""
 
-    # Pattern for code blocks (fenced)
-    CODE_BLOCK_PATTERN = re.compile(r"^```[\w]*\n[\s\S]*?^```", re.MULTILINE)
+    # Pattern for the opening line of a fenced code block
+    FENCE_OPEN_PATTERN = re.compile(r"^```[\w]*$")
 
     # Pattern for inline code
     INLINE_CODE_PATTERN = re.compile(r"`[^`]+`")
@@ -26,66 +27,67 @@ class MarkdownParser(BaseParser):
         return [".md"]
 
     def parse(self, file_path: Path) -> list[TextSegment]:
-        content = file_path.read_text(encoding="utf-8")
-        segments = []
-
-        # First, extract and replace code blocks with placeholders
-        code_blocks = []
-        placeholder_prefix = "___CODE_BLOCK_"
-
-        def replace_code_block(match):
-            idx = len(code_blocks)
-            code_blocks.append(match.group(0))
-            return f"{placeholder_prefix}{idx}___"
-
-        content_with_placeholders = self.CODE_BLOCK_PATTERN.sub(
-            replace_code_block, content
-        )
-
-        # Split by double newlines to identify blocks
-        blocks = content_with_placeholders.split("\n\n")
-
-        for block in blocks:
-            block = block.strip()
-            if not block:
-                continue
-
-            # Check if this is a code block placeholder
-            if block.startswith(placeholder_prefix) and block.endswith("___"):
-                try:
-                    idx = int(block[len(placeholder_prefix) : -3])
-                    segments.append(
-                        TextSegment(
-                            text=code_blocks[idx],
-                            metadata={"original": code_blocks[idx]},
-                            segment_type="code_block",
-                            skip_translation=True,
-                        )
-                    )
-                except (ValueError, IndexError):
-                    segments.append(
-                        TextSegment(text=block, segment_type="paragraph")
+        return list(self.iter_segments(file_path))
+
+    def iter_segments(self, file_path: Path) -> Iterator[TextSegment]:
+        # Blocks are separated by empty lines, except inside fenced code blocks
+        block_lines: list[str] = []
+        fence_lines: list[str] | None = None
+
+        for line in iter_lines(file_path):
+            if fence_lines is not None:
+                fence_lines.append(line)
+                if line.startswith("```"):
+                    code = "\n".join(fence_lines)
+                    yield TextSegment(
+                        text=code,
+                        metadata={"original": code},
+                        segment_type="code_block",
+                        skip_translation=True,
                     )
+                    fence_lines = None
                 continue
 
-            # Detect block type and store metadata
-            segment_type = self._detect_type(block)
-            metadata = {
-                "original_format": block,
-                "has_links": bool(self.LINK_PATTERN.search(block)),
-                "has_images": bool(self.IMAGE_PATTERN.search(block)),
-                "has_inline_code": bool(self.INLINE_CODE_PATTERN.search(block)),
-            }
-
-            segments.append(
-                TextSegment(
-                    text=block,
-                    metadata=metadata,
-                    segment_type=segment_type,
-                )
-            )
-
-        return segments
+            if self.FENCE_OPEN_PATTERN.match(line):
+                yield from self._block(block_lines)
+                block_lines = []
+                fence_lines = [line]
+            elif line:
+                block_lines.append(line)
+            else:
+                yield from self._block(block_lines)
+                block_lines = []
+
+        if fence_lines is not None:
+            # Unterminated fence: treat its lines as ordinary text
+            for line in fence_lines:
+                if line:
+                    block_lines.append(line)
+                else:
+                    yield from self._block(block_lines)
+                    block_lines = []
+        yield from self._block(block_lines)
+
+    def _block(self, lines: list[str]) -> Iterator[TextSegment]:
+        """Yield a text block segment from its lines, if it has any text."""
+        block = "\n".join(lines).strip()
+        if not block:
+            return
+
+        # Detect block type and store metadata
+        segment_type = self._detect_type(block)
+        metadata = {
+            "original_format": block,
+            "has_links": bool(self.LINK_PATTERN.search(block)),
+            "has_images": bool(self.IMAGE_PATTERN.search(block)),
+            "has_inline_code": bool(self.INLINE_CODE_PATTERN.search(block)),
+        }
+
+        yield TextSegment(
+            text=block,
+            metadata=metadata,
+            segment_type=segment_type,
+        )
 
     def _detect_type(self, block: str) -> str:
         """Detect the type of markdown block."""
@@ -110,13 +112,20 @@ class MarkdownParser(BaseParser):
         output_path: Path,
         template_path: Path | None = None,
     ) -> None:
-        output_parts = []
-
-        for segment in segments:
-            if segment.skip_translation:
-                # Keep code blocks unchanged
-                output_parts.append(segment.metadata.get("original", segment.text))
-            else:
-                output_parts.append(segment.text)
+        with self.open_writer(output_path, template_path) as writer:
+            writer.write_segments(segments)
 
-        output_path.write_text("\n\n".join(output_parts), encoding="utf-8")
+    def open_writer(
+        self,
+        output_path: Path,
+        template_path: Path | None = None,
+    ) -> SegmentWriter:
+        return StreamingTextWriter(output_path, render=self._render)
+
+    @staticmethod
+    def _render(segment: TextSegment) -> str:
+        """Render a segment as Markdown output."""
+        if segment.skip_translation:
+            # Keep code blocks unchanged
+            return segment.metadata.get("original", segment.text)
+        return segment.text
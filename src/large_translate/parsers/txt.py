@@ -1,8 +1,9 @@
 """Plain text file parser."""
 
+from collections.abc import Iterator
 from pathlib import Path
 
-from .base import BaseParser, TextSegment
+from .base import BaseParser, SegmentWriter, StreamingTextWriter, TextSegment, iter_lines
 
 
 class TxtParser(BaseParser):
@@ -13,24 +14,28 @@ class TxtParser(BaseParser):
         return [".txt"]
 
     def parse(self, file_path: Path) -> list[TextSegment]:
-        content = file_path.read_text(encoding="utf-8")
-
-        # Split by double newlines to identify paragraphs
-        paragraphs = content.split("\n\n")
-
-        segments = []
-        for para in paragraphs:
-            para = para.strip()
-            if para:
-                segments.append(
-                    TextSegment(
-                        text=para,
-                        metadata={},
-                        segment_type="paragraph",
-                    )
-                )
-
-        return segments
+        return list(self.iter_segments(file_path))
+
+    def iter_segments(self, file_path: Path) -> Iterator[TextSegment]:
+        # Paragraphs are separated by empty lines (double newlines)
+        lines: list[str] = []
+        for line in iter_lines(file_path):
+            if line:
+                lines.append(line)
+                continue
+            yield from self._paragraph(lines)
+            lines = []
+        yield from self._paragraph(lines)
+
+    def _paragraph(self, lines: list[str]) -> Iterator[TextSegment]:
+        """Yield a paragraph segment from its lines, if it has any text."""
+        para = "\n".join(lines).strip()
+        if para:
+            yield TextSegment(
+                text=para,
+                metadata={},
+                segment_type="paragraph",
+            )
 
     def write(
         self,
@@ -38,5 +43,12 @@ class TxtParser(BaseParser):
         output_path: Path,
         template_path: Path | None = None,
     ) -> None:
-        output_parts = [seg.text for seg in segments]
-        output_path.write_text("\n\n".join(output_parts), encoding="utf-8")
+        with self.open_writer(output_path, template_path) as writer:
+            writer.write_segments(segments)
+
+    def open_writer(
+        self,
+        output_path: Path,
+        template_path: Path | None = None,
+    ) -> SegmentWriter:
+        return StreamingTextWriter(output_path, render=lambda seg: seg.text)
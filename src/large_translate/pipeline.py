@@ -0,0 +1,159 @@
+"""Bounded-concurrency and re-splitting helpers for pipelined chunk processing."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Generic, TypeVar
+
+from .chunking import Chunk, join_split_chunk, split_chunk
+from .models.base import TranslationTruncatedError
+from .parsers.base import TextSegment
+
+T = TypeVar("T")
+
+
+async def run_bounded(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[None]],
+    limit: int,
+) -> None:
+    """
+    Run a worker over items keeping at most `limit` calls in flight.
+
+    Items are dispatched in iteration order and the iterable is consumed lazily,
+    so a new item is only pulled once a slot frees up. The first failure cancels
+    all remaining in-flight work and is re-raised.
+
+    Args:
+        items: Items to process.
+        worker: Coroutine function called once per item.
+        limit: Maximum number of concurrent worker calls.
+    """
+    limit = max(1, limit)
+    in_flight: set[asyncio.Task] = set()
+    try:
+        for item in items:
+            if len(in_flight) >= limit:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                _raise_failure(done)
+            in_flight.add(asyncio.create_task(worker(item)))
+
+        while in_flight:
+            done, in_flight = await asyncio.wait(
+                in_flight, return_when=asyncio.FIRST_EXCEPTION
+            )
+            _raise_failure(done)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+def _raise_failure(done: set[asyncio.Task]) -> None:
+    """
+    Re-raise the first failure among finished tasks.
+
+    Every task's exception is retrieved first, so tasks failing together are
+    not reported as "exception was never retrieved".
+    """
+    errors = [task.exception() for task in done if not task.cancelled()]
+    for error in errors:
+        if error is not None:
+            raise error
+
+
+class ReorderBuffer(Generic[T]):
+    """Buffers results that complete out of order and releases them in index order."""
+
+    def __init__(self, start: int = 0):
+        """
+        Initialize the buffer.
+
+        Args:
+            start: Index of the first result to release.
+        """
+        self.next_index = start
+        self._pending: dict[int, T] = {}
+
+    def add(self, index: int, item: T) -> list[tuple[int, T]]:
+        """
+        Add a completed result.
+
+        Returns:
+            The (index, item) pairs that are now contiguous with what has
+            already been released, in order. Empty if there is still a gap.
+        """
+        self._pending[index] = item
+        ready = []
+        while self.next_index in self._pending:
+            ready.append((self.next_index, self._pending.pop(self.next_index)))
+            self.next_index += 1
+        return ready
+
+    def __len__(self) -> int:
+        """Number of results waiting on an earlier index."""
+        return len(self._pending)
+
+
+async def translate_resplitting(
+    chunk: Chunk,
+    translate: Callable[[Chunk], Awaitable[list[TextSegment]]],
+    on_split: Callable[[Chunk], None] | None = None,
+) -> list[TextSegment]:
+    """
+    Translate a chunk, re-splitting it whenever the output is truncated.
+
+    A chunk whose translation hits the model's output token limit is split in
+    half with `split_chunk` and only the halves are translated, recursively,
+    so no content is lost and the full chunk is never retried.
+
+    Args:
+        chunk: Chunk to translate.
+        translate: Translates one chunk, raising TranslationTruncatedError if
+            the output was cut off.
+        on_split: Called with each chunk before it is split.
+
+    Returns:
+        Translated segments matching the chunk's segments one to one.
+
+    Raises:
+        TranslationTruncatedError: If a truncated chunk cannot be split further.
+    """
+    try:
+        return await translate(chunk)
+    except TranslationTruncatedError:
+        translated = await translate_halves(chunk, translate, on_split)
+        if translated is None:
+            raise
+        return translated
+
+
+async def translate_halves(
+    chunk: Chunk,
+    translate: Callable[[Chunk], Awaitable[list[TextSegment]]],
+    on_split: Callable[[Chunk], None] | None = None,
+) -> list[TextSegment] | None:
+    """
+    Split a chunk in half and translate each half with `translate_resplitting`.
+
+    The halves are translated one after the other so they share the chunk's
+    rate-limit slot and context.
+
+    Returns:
+        Translated segments matching the chunk's segments one to one, or None
+        if the chunk cannot be split.
+    """
+    halves = split_chunk(chunk)
+    if halves is None:
+        return None
+    if on_split is not None:
+        on_split(chunk)
+
+    first, second = halves
+    return join_split_chunk(
+        chunk,
+        await translate_resplitting(first, translate, on_split),
+        await translate_resplitting(second, translate, on_split),
+    )
@@ -0,0 +1,126 @@
+"""Scheduling of batch status checks."""
+
+import asyncio
+import threading
+
+
+class PollSchedule:
+    """
+    Adaptive interval between status checks of one batch.
+
+    Checks start at the shortest interval, catching batches that are
+    rejected or finish within seconds. While a batch makes no progress, e.g.
+    queued behind other jobs, the interval doubles up to the longest. Once
+    requests complete, the next check is timed for halfway to the completion
+    estimated from the rate they complete at, so checks speed up as the
+    batch nears the end.
+    """
+
+    # Factor the interval grows by after a check without progress
+    BACKOFF = 2.0
+
+    def __init__(self, min_interval: float, max_interval: float):
+        """
+        Initialize the schedule.
+
+        Args:
+            min_interval: Shortest wait between checks, in seconds.
+            max_interval: Longest wait between checks, in seconds.
+        """
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.interval = self.min_interval
+        # (time, completed requests) when progress was last seen
+        self._progress: tuple[float, int] | None = None
+
+    def next_interval(self, completed: int, total: int, now: float) -> float:
+        """
+        Get the wait before the next check.
+
+        Args:
+            completed: Requests completed so far, as of this check.
+            total: Requests in the batch.
+            now: Time of this check, in seconds on a monotonic clock.
+
+        Returns:
+            Seconds to wait.
+        """
+        if self._progress is None:
+            self._progress = (now, completed)
+        else:
+            since, before = self._progress
+            if completed > before and now > since:
+                rate = (completed - before) / (now - since)
+                self.interval = max(total - completed, 0) / rate / 2
+                self._progress = (now, completed)
+            else:
+                self.interval *= self.BACKOFF
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        return self.interval
+
+
+class BatchNotifier:
+    """
+    Wakes batch pollers ahead of their next scheduled status check.
+
+    Stands in for provider webhooks: a webhook receiver, queue consumer or any
+    other callback calls `notify` when a batch may have changed, from the
+    event loop or from another thread, and the engine checks that batch
+    right away instead of waiting out its poll interval.
+    """
+
+    def __init__(self):
+        """Initialize the notifier."""
+        self._lock = threading.Lock()
+        self._waiters: dict[str, set[asyncio.Future]] = {}
+        # Batches waited on so far, and those notified since their last wait
+        self._known: set[str] = set()
+        self._pending: set[str] = set()
+
+    def notify(self, batch_id: str | None = None) -> None:
+        """
+        Wake the poller of a batch for an immediate status check.
+
+        Args:
+            batch_id: The batch that changed, or None for every batch.
+        """
+        with self._lock:
+            batch_ids = set(self._known) if batch_id is None else {batch_id}
+            self._pending |= batch_ids
+            waiters = [w for b in batch_ids for w in self._waiters.get(b, ())]
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+
+    async def wait(self, batch_id: str, timeout: float) -> bool:
+        """
+        Wait for a notification about a batch, at most `timeout` seconds.
+
+        A notification that arrived since the last wait returns immediately.
+
+        Returns:
+            Whether a notification arrived.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._known.add(batch_id)
+            if batch_id in self._pending:
+                self._pending.discard(batch_id)
+                return True
+            self._waiters.setdefault(batch_id, set()).add(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            waiter.cancel()
+            with self._lock:
+                self._waiters[batch_id].discard(waiter)
+                if not self._waiters[batch_id]:
+                    del self._waiters[batch_id]
+                notified = batch_id in self._pending
+                self._pending.discard(batch_id)
+        return notified
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future) -> None:
+        """Resolve a waiter unless it already timed out."""
+        if not waiter.done():
+            waiter.set_result(None)
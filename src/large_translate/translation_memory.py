@@ -0,0 +1,143 @@
+"""Persistent translation memory for reusing earlier translations."""
+
+import hashlib
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+
+from .prompts import PROMPT_VERSION
+
+
+def memory_key(
+    text: str,
+    target_language: str,
+    source_language: str | None,
+    model_id: str,
+) -> str:
+    """
+    Build the lookup key for a source text.
+
+    The key covers everything that determines the translation: the text, both
+    languages, the model and the prompt version.
+    """
+    parts = [PROMPT_VERSION, model_id, source_language or "", target_language, text]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite-backed store of translations keyed by `memory_key`."""
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a translation memory.
+
+        Args:
+            path: Path to the SQLite database file.
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        # WAL lets concurrent runs read while another one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """Get a stored translation, or None if not present."""
+        row = self._conn.execute(
+            "SELECT translation FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Get stored translations for several keys; missing keys are omitted."""
+        found: dict[str, str] = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, translation FROM translations WHERE key IN ({placeholders})",
+                batch,
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        """Store (key, translation) pairs, replacing existing entries."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)",
+                entries,
+            )
+
+    def recall(
+        self,
+        texts: list[str],
+        target_language: str,
+        source_language: str | None,
+        model_id: str,
+    ) -> list[str] | None:
+        """
+        Look up translations for a chunk's segment texts.
+
+        Segment-level entries are tried first; if any segment is missing, the
+        whole chunk's combined text is tried. A combined translation that does
+        not split into one part per text (e.g. a part containing a blank line)
+        is a miss rather than a misaligned hit.
+
+        Returns:
+            One translated part per text, or None if the chunk is not covered.
+        """
+        keys = [memory_key(t, target_language, source_language, model_id) for t in texts]
+        found = self.get_many(keys)
+        if all(k in found for k in keys):
+            return [found[k] for k in keys]
+
+        combined = self.get(
+            memory_key("\n\n".join(texts), target_language, source_language, model_id)
+        )
+        if combined is not None:
+            parts = combined.split("\n\n")
+            if len(parts) == len(texts):
+                return parts
+        return None
+
+    def remember(
+        self,
+        texts: list[str],
+        translated_parts: list[str],
+        target_language: str,
+        source_language: str | None,
+        model_id: str,
+    ) -> None:
+        """
+        Store a chunk's translation.
+
+        The chunk is stored as a whole unless a part is blank; segment-level
+        entries are only stored when the translation lines up one part per
+        segment, and never for a blank part. A segment the model dropped is
+        thereby translated again by later runs rather than served blank.
+        """
+        entries = []
+        if all(part.strip() for part in translated_parts):
+            entries.append(
+                (
+                    memory_key("\n\n".join(texts), target_language, source_language, model_id),
+                    "\n\n".join(translated_parts),
+                )
+            )
+        if len(translated_parts) == len(texts):
+            entries.extend(
+                (memory_key(t, target_language, source_language, model_id), part)
+                for t, part in zip(texts, translated_parts)
+                if part.strip()
+            )
+        self.put_many(entries)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()